@@ -4,20 +4,28 @@ import time
 import re
 import smtplib
 import json
+import sys
 import importlib
 import threading
+import asyncio
+import concurrent.futures
+import tracemalloc
+import os
+import cProfile
+import pstats
+import marshal
+import collections
+import functools
+import inspect
+import uuid
+import numpy as np
+import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import streamlit.components.v1 as components
 from email.message import EmailMessage
 from streamlit.errors import StreamlitSecretNotFoundError
-from filelock import FileLock
-
-try:
-    from streamlit_autorefresh import st_autorefresh
-except ModuleNotFoundError:
-    def st_autorefresh(interval=0, key=None):
-        return 1
+from filelock import FileLock, Timeout
 
 st.set_page_config(page_title="Spinner Wheel", page_icon="🎰")
 
@@ -28,8 +36,250 @@ Once an option's limit is reached, it will no longer be available.
 """)
 
 STORE_PATH = Path(__file__).parent / "data" / "shared_state.json"
-LOCK_PATH = str(STORE_PATH) + ".lock"
-STATE_OP_LOCK = threading.Lock()
+WHEEL_COMPONENT_PATH = Path(__file__).parent / "wheel_component"
+CHANGES_PATH = STORE_PATH.parent / "shared_changes.json"
+CHANGE_LOG_LIMIT = 200
+WRITE_BEHIND_PATH = STORE_PATH.parent / "write_behind.jsonl"
+WRITE_BEHIND_BATCH_SIZE = 200
+APPLIED_OP_LIMIT = 1000
+TRACE_PATH = STORE_PATH.parent / "op_trace.jsonl"
+REPLAY_STORE_PATH = STORE_PATH.parent / "replay" / STORE_PATH.name
+REPLAY_WORKERS = 16
+CLOUD_RETRY_SECONDS = 15
+CLOUD_TIMEOUT_SECONDS = 10
+PLANNER_BATCH_ELEMENTS = 4_000_000
+PLANNER_HISTOGRAM_CELLS = 5_000_000
+PLANNER_WORK_BUDGET = 8_000_000
+TEAM_STATS_MAX_BUCKETS = 60
+LEADERBOARD_TOP_K = 50
+OPTIONS_PAGE_SIZE = 25
+OPTIONS_SORT_ORDERS = ("Most remaining", "Fewest remaining", "Name")
+SESSION_VIEW = ("options", "pending", "leaderboard")
+STORE_SECTIONS = ("meta", "options", "pending", "completed")
+STORE_INDEX_WIDTH = 12
+PROJECTION_META_SELECT = (
+    "version:state->version, spin_id:state->spin_id, updated_at:state->updated_at, "
+    "latest_result:state->latest_result, next_submission_seq:state->next_submission_seq"
+)
+SPIN_ANIMATION_MS = 4200
+SPIN_LANDING_GRACE_MS = 3000
+SYNC_INTERVAL_SECONDS = 3
+PROFILER_KINDS = {"cprofile": "cProfile (pstats)", "sampling": "Sampling (speedscope)"}
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_KEEP_LIMIT = 10
+CPROFILE_STALE_SECONDS = 120
+
+wheel_component = components.declare_component("spinner_wheel", path=str(WHEEL_COMPONENT_PATH))
+
+
+@st.cache_resource
+def get_profile_store():
+    # Slow-rerun profiles are kept per process, so a profile captured in a client's session can be downloaded from another.
+    return {"lock": threading.Lock(), "profiles": collections.deque(maxlen=PROFILE_KEEP_LIMIT)}
+
+
+@st.cache_resource
+def get_cprofile_slot():
+    # On Python 3.12+ cProfile is one process-wide tool that also records other threads, so one session holds it at a time.
+    return {"lock": threading.Lock(), "profile": None}
+
+
+def requested_profiler_kind():
+    requested = st.query_params.get("profile")
+    if requested in PROFILER_KINDS:
+        return requested
+    if requested:
+        return "cprofile"
+    if st.session_state.profiler_enabled:
+        return st.session_state.profiler_kind
+    return None
+
+
+def start_sampling_profiler():
+    sampler = {
+        "thread_id": threading.get_ident(),
+        "samples": [],
+        "stop_event": threading.Event(),
+        "started": time.perf_counter()
+    }
+
+    def sample():
+        while not sampler["stop_event"].wait(PROFILE_SAMPLE_INTERVAL_SECONDS):
+            frame = sys._current_frames().get(sampler["thread_id"])
+            stack = []
+            while frame is not None:
+                stack.append((frame.f_code.co_name, frame.f_code.co_filename, frame.f_code.co_firstlineno))
+                frame = frame.f_back
+            sampler["samples"].append((time.perf_counter(), stack[::-1]))
+
+    sampler["thread"] = threading.Thread(target=sample, name="rerun-sampler", daemon=True)
+    sampler["thread"].start()
+    return sampler
+
+
+def stop_sampling_profiler(sampler):
+    sampler["stop_event"].set()
+    sampler["thread"].join()
+
+
+def speedscope_profile(sampler, name):
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+    previous = sampler["started"]
+    for sampled_at, stack in sampler["samples"]:
+        # Drop the Streamlit runner frames above the script itself.
+        script_start = next((index for index, frame in enumerate(stack) if frame[1] == __file__), 0)
+        indices = []
+        for frame in stack[script_start:]:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indices.append(frame_index[frame])
+        samples.append(indices)
+        weights.append((sampled_at - previous) * 1000)
+        previous = sampled_at
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "spinner-wheel",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights
+        }]
+    }
+
+
+def start_profile(label):
+    kind = requested_profiler_kind()
+    if kind is None or st.session_state.active_profile is not None:
+        return None
+
+    profile = {"kind": kind, "label": label, "started": time.perf_counter(), "captured_at": time.time(), "fallback": False}
+    if kind == "cprofile" and not claim_cprofile(profile):
+        # Another session (or another profiling tool) holds cProfile; the sampler only watches this thread.
+        profile["kind"] = "sampling"
+        profile["fallback"] = True
+    if profile["kind"] == "sampling":
+        profile["sampler"] = start_sampling_profiler()
+    st.session_state.active_profile = profile
+    return profile
+
+
+def claim_cprofile(profile):
+    slot = get_cprofile_slot()
+    with slot["lock"]:
+        owner = slot["profile"]
+        if owner is not None and time.perf_counter() - owner["started"] > CPROFILE_STALE_SECONDS:
+            # The owner's run ended early and its session never came back to stop it.
+            owner["profiler"].disable()
+            slot["profile"] = None
+        if slot["profile"] is not None:
+            return False
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return False
+        profile["profiler"] = profiler
+        slot["profile"] = profile
+        return True
+
+
+def release_cprofile(profile):
+    slot = get_cprofile_slot()
+    with slot["lock"]:
+        profile["profiler"].disable()
+        if slot["profile"] is profile:
+            slot["profile"] = None
+
+
+def stop_profile(profile):
+    st.session_state.active_profile = None
+    if profile["kind"] == "cprofile":
+        release_cprofile(profile)
+    else:
+        stop_sampling_profiler(profile["sampler"])
+
+
+def finish_profile(profile):
+    if profile is None:
+        return
+
+    stop_profile(profile)
+    elapsed_ms = (time.perf_counter() - profile["started"]) * 1000
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile["captured_at"]))
+    file_stem = f"spinner-{profile['label'].replace(' ', '-')}-{stamp}"
+    if profile["kind"] == "cprofile":
+        # Same bytes as pstats.Stats.dump_stats, so the file opens with pstats, snakeviz or gprof2dot.
+        data = marshal.dumps(pstats.Stats(profile["profiler"]).stats)
+        file_name = f"{file_stem}.pstats"
+        mime = "application/octet-stream"
+    else:
+        data = json.dumps(speedscope_profile(profile["sampler"], f"{profile['label']} {stamp}")).encode("utf-8")
+        file_name = f"{file_stem}.speedscope.json"
+        mime = "application/json"
+
+    record = {
+        "label": profile["label"],
+        "kind": profile["kind"],
+        "fallback": profile["fallback"],
+        "elapsed_ms": elapsed_ms,
+        "captured_at": profile["captured_at"],
+        "file_name": file_name,
+        "mime": mime,
+        "data": data
+    }
+    st.session_state.last_profile = record
+    if elapsed_ms >= st.session_state.profiler_threshold_ms:
+        store = get_profile_store()
+        with store["lock"]:
+            store["profiles"].appendleft(record)
+
+
+def profiled(label):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fragment inside a profiled full run is already covered by the script profile.
+            profile = start_profile(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish_profile(profile)
+        return wrapper
+    return decorator
+
+
+if 'profiler_enabled' not in st.session_state:
+    st.session_state.profiler_enabled = False
+
+if 'profiler_kind' not in st.session_state:
+    st.session_state.profiler_kind = "cprofile"
+
+if 'profiler_threshold_ms' not in st.session_state:
+    st.session_state.profiler_threshold_ms = 500
+
+if 'active_profile' not in st.session_state:
+    st.session_state.active_profile = None
+
+if 'last_profile' not in st.session_state:
+    st.session_state.last_profile = None
+
+if st.session_state.active_profile is not None:
+    # The previous run ended early (st.rerun / st.stop), so its partial profile is dropped.
+    stop_profile(st.session_state.active_profile)
+
+script_profile = start_profile("full run")
 
 
 def default_shared_state():
@@ -39,16 +289,75 @@ def default_shared_state():
         "latest_result": None,
         "next_submission_seq": 1,
         "spin_id": 0,
+        "version": 0,
+        "changes": [],
+        "applied_ops": {},
         "updated_at": time.time()
     }
 
 
+class Assignment:
+    # Compact record for one spin assignment; names are interned so repeated teams/tasks share one string.
+    __slots__ = ("spin_id", "option_name", "assigned_at_ms", "team_name", "completed_at_ms", "submission_seq")
+
+    def __init__(self, spin_id, option_name, assigned_at_ms, team_name="", completed_at_ms=None, submission_seq=None):
+        self.spin_id = spin_id
+        self.option_name = sys.intern(option_name)
+        self.assigned_at_ms = assigned_at_ms
+        self.team_name = sys.intern(team_name)
+        self.completed_at_ms = completed_at_ms
+        self.submission_seq = submission_seq
+
+    @classmethod
+    def from_json(cls, item, fallback_assigned_ms):
+        # Already-normalized states pass their records straight through instead of rebuilding them.
+        if isinstance(item, cls):
+            return item
+        if not isinstance(item, dict):
+            return None
+        spin_id = item.get("spin_id")
+        option_name = str(item.get("option_name", "")).strip()
+        if not isinstance(spin_id, int) or not option_name:
+            return None
+
+        assigned_at_raw = item.get("assigned_at_ms")
+        completed_raw = item.get("completed_at_ms")
+        submission_seq = item.get("submission_seq")
+        return cls(
+            spin_id,
+            option_name,
+            int(assigned_at_raw) if isinstance(assigned_at_raw, (int, float)) else fallback_assigned_ms,
+            str(item.get("team_name", "")).strip(),
+            int(completed_raw) if isinstance(completed_raw, (int, float)) else None,
+            submission_seq if isinstance(submission_seq, int) and submission_seq > 0 else None
+        )
+
+    def to_json(self):
+        return {
+            "spin_id": self.spin_id,
+            "option_name": self.option_name,
+            "assigned_at_ms": self.assigned_at_ms,
+            "team_name": self.team_name,
+            "completed_at_ms": self.completed_at_ms,
+            "submission_seq": self.submission_seq
+        }
+
+
+def state_to_json(state):
+    payload = dict(state)
+    payload["assignments"] = [item.to_json() for item in state["assignments"]]
+    return payload
+
+
 def normalize_state(state):
     if not isinstance(state, dict):
         state = default_shared_state()
 
     if "options" not in state or not isinstance(state["options"], list):
         state["options"] = []
+    for option in state["options"]:
+        if isinstance(option, dict) and isinstance(option.get("name"), str):
+            option["name"] = sys.intern(option["name"])
     if "assignments" not in state or not isinstance(state["assignments"], list):
         state["assignments"] = []
     if "latest_result" not in state or not isinstance(state["latest_result"], dict):
@@ -59,39 +368,27 @@ def normalize_state(state):
         state["next_submission_seq"] = 1
     if "spin_id" not in state or not isinstance(state["spin_id"], int):
         state["spin_id"] = 0
+    if "version" not in state or not isinstance(state["version"], int) or state["version"] < 0:
+        state["version"] = 0
+    if "changes" not in state or not isinstance(state["changes"], list):
+        state["changes"] = []
+    if "applied_ops" not in state or not isinstance(state["applied_ops"], dict):
+        state["applied_ops"] = {}
     if "updated_at" not in state:
         state["updated_at"] = time.time()
 
-    normalized_assignments = []
+    state["changes"] = [
+        change for change in state["changes"]
+        if isinstance(change, dict) and isinstance(change.get("seq"), int) and change.get("seq") <= state["version"]
+    ][-CHANGE_LOG_LIMIT:]
+    state["applied_ops"] = dict(list(state["applied_ops"].items())[-APPLIED_OP_LIMIT:])
+
     fallback_assigned_ms = int(float(state.get("updated_at", time.time())) * 1000)
+    normalized_assignments = []
     for item in state["assignments"]:
-        if not isinstance(item, dict):
-            continue
-        spin_id = item.get("spin_id")
-        option_name = str(item.get("option_name", "")).strip()
-        if not isinstance(spin_id, int) or not option_name:
-            continue
-
-        assigned_at_raw = item.get("assigned_at_ms")
-        if isinstance(assigned_at_raw, (int, float)):
-            assigned_at_ms = int(assigned_at_raw)
-        else:
-            assigned_at_ms = fallback_assigned_ms
-
-        completed_raw = item.get("completed_at_ms")
-        if isinstance(completed_raw, (int, float)):
-            completed_at_ms = int(completed_raw)
-        else:
-            completed_at_ms = None
-
-        normalized_assignments.append({
-            "spin_id": spin_id,
-            "option_name": option_name,
-            "assigned_at_ms": assigned_at_ms,
-            "team_name": str(item.get("team_name", "")).strip(),
-            "completed_at_ms": completed_at_ms,
-            "submission_seq": int(item.get("submission_seq")) if isinstance(item.get("submission_seq"), int) and int(item.get("submission_seq")) > 0 else None
-        })
+        assignment = Assignment.from_json(item, fallback_assigned_ms)
+        if assignment is not None:
+            normalized_assignments.append(assignment)
 
     state["assignments"] = normalized_assignments
 
@@ -127,6 +424,144 @@ def format_duration_ms(duration_ms):
     return f"{int(duration_ms)} ms"
 
 
+def record_change(state, op, **payload):
+    state["version"] = int(state.get("version", 0)) + 1
+    change = {"seq": state["version"], "op": op, "at": time.time()}
+    change.update(payload)
+    state["changes"] = (list(state.get("changes", [])) + [change])[-CHANGE_LOG_LIMIT:]
+    return change
+
+
+def changes_since(version, changes, since_version):
+    if since_version == version:
+        return []
+    if since_version > version:
+        return None
+
+    pending = [change for change in changes if change.get("seq", 0) > since_version]
+    if not pending or pending[0]["seq"] != since_version + 1 or pending[-1]["seq"] != version:
+        return None
+    return pending
+
+
+def add_assignment(state, assignment):
+    assignment = Assignment.from_json(assignment, current_time_ms())
+    if assignment is not None and not any(item.spin_id == assignment.spin_id for item in state["assignments"]):
+        state["assignments"].append(assignment)
+
+
+def apply_change(state, change):
+    op = change.get("op")
+    if op == "reset":
+        state.clear()
+        state.update(default_shared_state())
+    elif op == "option_added":
+        state["options"].append(dict(change["option"]))
+    elif op == "spin":
+        option_index = change.get("option_index")
+        if isinstance(option_index, int) and 0 <= option_index < len(state["options"]):
+            state["options"][option_index]["remaining"] = int(change.get("remaining", 0))
+        state["spin_id"] = max(int(state.get("spin_id", 0)), int(change.get("spin_id", 0)))
+        if isinstance(change.get("assignment"), dict):
+            add_assignment(state, change["assignment"])
+        if isinstance(change.get("latest_result"), dict):
+            state["latest_result"] = dict(change["latest_result"])
+    elif op == "assignment_added":
+        add_assignment(state, change["assignment"])
+    elif op == "assignment_completed":
+        for item in state["assignments"]:
+            if item.spin_id == change.get("spin_id"):
+                item.team_name = sys.intern(str(change.get("team_name", "")))
+                item.completed_at_ms = change.get("completed_at_ms")
+                item.submission_seq = change.get("submission_seq")
+                break
+        if isinstance(change.get("submission_seq"), int):
+            state["next_submission_seq"] = max(int(state.get("next_submission_seq", 1)), change["submission_seq"] + 1)
+    elif op == "latest_result":
+        state["latest_result"] = dict(change["result"])
+
+    state["version"] = int(change.get("seq", state.get("version", 0)))
+    if isinstance(change.get("at"), (int, float)):
+        state["updated_at"] = change["at"]
+    return state
+
+
+def leaderboard_key(item):
+    return (max(item.completed_at_ms - item.assigned_at_ms, 0), item.completed_at_ms, item.submission_seq or 0)
+
+
+def project_state(state, projections, limit=LEADERBOARD_TOP_K):
+    # Same shape as a full state, holding only what the requested projections render:
+    # "options" (names and counts), "pending" assignments, "leaderboard" (top-k completed) or all "completed".
+    view = {key: state.get(key) for key in ("latest_result", "next_submission_seq", "spin_id", "version", "updated_at")}
+    view["options"] = []
+    if "options" in projections:
+        view["options"] = [
+            {"name": option["name"], "limit": option["limit"], "remaining": option["remaining"]}
+            for option in state["options"]
+        ]
+
+    completed = sorted((item for item in state["assignments"] if item.completed_at_ms), key=leaderboard_key)
+    view["assignments"] = []
+    if "pending" in projections:
+        view["assignments"].extend(sorted(
+            (item for item in state["assignments"] if not item.completed_at_ms),
+            key=lambda item: item.spin_id
+        ))
+    if "completed" in projections:
+        view["assignments"].extend(completed)
+    elif "leaderboard" in projections:
+        view["assignments"].extend(completed[:limit])
+    view["completed_count"] = len(completed)
+    view["changes"] = []
+    return view
+
+
+def trim_view(view, limit=LEADERBOARD_TOP_K):
+    pending = [item for item in view["assignments"] if not item.completed_at_ms]
+    completed = sorted((item for item in view["assignments"] if item.completed_at_ms), key=leaderboard_key)
+    view["assignments"] = pending + completed[:limit]
+    view.setdefault("completed_count", len(completed))
+    return view
+
+
+def benchmark_assignment_memory(count, team_count=40, option_count=200):
+    rows = []
+    for index in range(count):
+        completed = index % 3 != 0
+        rows.append({
+            "spin_id": index + 1,
+            "option_name": f"Task {index % option_count}",
+            "assigned_at_ms": 1_700_000_000_000 + index * 1000,
+            "team_name": f"Team {index % team_count}" if completed else "",
+            "completed_at_ms": 1_700_000_000_000 + index * 1000 + 60_000 if completed else None,
+            "submission_seq": index + 1 if completed else None
+        })
+    payload = json.dumps(rows)
+    del rows
+
+    results = []
+    for label, load in (
+        ("JSON dicts", lambda: json.loads(payload)),
+        ("Slots records", lambda: [Assignment.from_json(item, 0) for item in json.loads(payload)])
+    ):
+        tracemalloc.start()
+        try:
+            loaded = load()
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del loaded
+        results.append({
+            "Representation": label,
+            "Assignments": count,
+            "Retained MB per session": round(retained / 1_048_576, 2),
+            "Peak MB while loading": round(peak / 1_048_576, 2),
+            "Bytes per assignment": int(retained / max(count, 1))
+        })
+    return results
+
+
 def get_sync_config():
     try:
         sync = st.secrets["sync"]
@@ -153,80 +588,286 @@ def get_sync_config():
 
 
 @st.cache_resource
-def get_supabase_client(url, key):
-    supabase_module = importlib.import_module("supabase")
-    return supabase_module.create_client(url, key)
+def get_cloud_runtime():
+    # One event loop thread per process, so every session reuses the same async client and its connections.
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="supabase-io", daemon=True)
+    thread.start()
+    return {"loop": loop, "thread": thread, "clients": {}, "client_lock": asyncio.Lock(), "projection_rpc": True, "changes_rpc": True}
+
+
+async def get_async_supabase_client(runtime, url, key):
+    async with runtime["client_lock"]:
+        if (url, key) not in runtime["clients"]:
+            supabase_module = importlib.import_module("supabase")
+            runtime["clients"][(url, key)] = await supabase_module.acreate_client(url, key)
+    return runtime["clients"][(url, key)]
+
+
+async def gather_cloud_operations(runtime, sync_config, operations, return_exceptions):
+    client = await get_async_supabase_client(runtime, sync_config["supabase_url"], sync_config["supabase_key"])
+    return await asyncio.gather(*(operation(client) for operation in operations), return_exceptions=return_exceptions)
 
 
-def run_with_retries(operation, attempts=3, delay_seconds=0.35):
+def run_cloud_operations(sync_config, operations, timeout=CLOUD_TIMEOUT_SECONDS, return_exceptions=False):
+    runtime = get_cloud_runtime()
+    future = asyncio.run_coroutine_threadsafe(
+        asyncio.wait_for(gather_cloud_operations(runtime, sync_config, operations, return_exceptions), timeout),
+        runtime["loop"]
+    )
+    try:
+        return future.result(timeout + 1)
+    except concurrent.futures.TimeoutError as error:
+        future.cancel()
+        raise TimeoutError(f"Cloud call timed out after {timeout}s") from error
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def run_cloud(sync_config, operation, timeout=CLOUD_TIMEOUT_SECONDS):
+    return run_cloud_operations(sync_config, [operation], timeout=timeout)[0]
+
+
+async def run_with_retries(operation, attempts=3, delay_seconds=0.35):
     last_error = None
     for attempt in range(attempts):
         try:
-            return operation()
+            return await operation()
         except Exception as error:
             last_error = error
             if attempt < attempts - 1:
-                time.sleep(delay_seconds)
+                await asyncio.sleep(delay_seconds)
     raise last_error
 
 
-def ensure_store_exists():
-    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with FileLock(LOCK_PATH, timeout=5):
-        if not STORE_PATH.exists():
-            STORE_PATH.write_text(json.dumps(default_shared_state(), indent=2), encoding="utf-8")
+def store_sidecar_paths(store_path):
+    return str(store_path) + ".lock", store_path.parent / CHANGES_PATH.name
+
+
+def ensure_store_exists(store_path=STORE_PATH):
+    lock_path, _ = store_sidecar_paths(store_path)
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(lock_path, timeout=5):
+        if not store_path.exists():
+            store_path.write_text(json.dumps(default_shared_state(), indent=2), encoding="utf-8")
 
 
-def load_local_shared_state():
-    ensure_store_exists()
-    with FileLock(LOCK_PATH, timeout=5):
+def load_local_shared_state(store_path=STORE_PATH):
+    lock_path, _ = store_sidecar_paths(store_path)
+    ensure_store_exists(store_path)
+    with FileLock(lock_path, timeout=5):
         try:
-            state = json.loads(STORE_PATH.read_text(encoding="utf-8"))
+            state = json.loads(store_path.read_text(encoding="utf-8"))
         except (json.JSONDecodeError, OSError):
             state = default_shared_state()
+        if isinstance(state, dict):
+            state.pop("_index", None)
         return normalize_state(state)
 
 
-def save_local_shared_state(state):
+def save_local_shared_state(state, store_path=STORE_PATH):
+    lock_path, changes_path = store_sidecar_paths(store_path)
     state = normalize_state(state)
     state["updated_at"] = time.time()
-    payload = json.dumps(state, indent=2)
-    with FileLock(LOCK_PATH, timeout=5):
-        STORE_PATH.write_text(payload, encoding="utf-8")
+    payload = encode_indexed_state(state)
+    changes_payload = json.dumps({"version": state["version"], "changes": state["changes"]})
+    # Bytes, not text mode: the index holds byte offsets, and Windows text mode would turn "\n" into "\r\n".
+    with FileLock(lock_path, timeout=5):
+        store_path.write_bytes(payload.encode("utf-8"))
+        changes_path.write_bytes(changes_payload.encode("utf-8"))
+
+
+def store_index_header(index):
+    bounds = ", ".join(
+        f'"{name}": [{start:{STORE_INDEX_WIDTH}d}, {end:{STORE_INDEX_WIDTH}d}, {count:{STORE_INDEX_WIDTH}d}]'
+        for name, (start, end, count) in ((name, index.get(name, (0, 0, 0))) for name in STORE_SECTIONS)
+    )
+    return '{"_index": {' + bounds + '},\n'
+
+
+def encode_indexed_state(state):
+    # Still one JSON document, but the first line holds fixed-width byte ranges of each section and every
+    # option/assignment sits on its own line (completed ones in leaderboard order), so projections can
+    # seek to the sections they need and stop after the top k.
+    meta = {key: value for key, value in state.items() if key not in ("options", "assignments", "changes", "_index")}
+    pending = sorted((item for item in state["assignments"] if not item.completed_at_ms), key=lambda item: item.spin_id)
+    completed = sorted((item for item in state["assignments"] if item.completed_at_ms), key=leaderboard_key)
+
+    chunks = []
+    index = {}
+    offset = len(store_index_header({}))
+
+    def append(text, section=None, count=0):
+        nonlocal offset
+        if section is not None:
+            index[section] = (offset, offset + len(text), count)
+        chunks.append(text)
+        offset += len(text)
+
+    append(",\n".join(f"{json.dumps(key)}: {json.dumps(value)}" for key, value in meta.items()), "meta", len(meta))
+    append(',\n"options": [\n')
+    append(",\n".join(json.dumps(option) for option in state["options"]), "options", len(state["options"]))
+    append('\n],\n"assignments": [\n')
+    append(",\n".join(json.dumps(item.to_json()) for item in pending), "pending", len(pending))
+    append(",\n" if pending and completed else "")
+    append(",\n".join(json.dumps(item.to_json()) for item in completed), "completed", len(completed))
+    append('\n],\n"changes": ' + json.dumps(state["changes"]) + "\n}\n")
+    return store_index_header(index) + "".join(chunks)
+
+
+def read_store_section(store, bounds, max_items=None):
+    start, end, _ = bounds
+    store.seek(start)
+    if max_items is None:
+        return json.loads(b"[" + store.read(end - start) + b"]")
+
+    items = []
+    while len(items) < max_items and store.tell() < end:
+        items.append(json.loads(store.readline().rstrip().rstrip(b",")))
+    return items
+
+
+def load_local_projection(projections, limit=LEADERBOARD_TOP_K, store_path=STORE_PATH):
+    lock_path, _ = store_sidecar_paths(store_path)
+    ensure_store_exists(store_path)
+    index = None
+    with FileLock(lock_path, timeout=5):
+        with store_path.open("rb") as store:
+            try:
+                index = json.loads(store.readline().rstrip().rstrip(b",") + b"}")["_index"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                index = None
+
+            if index is not None:
+                try:
+                    store.seek(index["meta"][0])
+                    state = json.loads(b"{" + store.read(index["meta"][1] - index["meta"][0]) + b"}")
+                    state["options"] = read_store_section(store, index["options"]) if "options" in projections else []
+                    state["assignments"] = read_store_section(store, index["pending"]) if "pending" in projections else []
+                    if "completed" in projections:
+                        state["assignments"] += read_store_section(store, index["completed"])
+                    elif "leaderboard" in projections:
+                        state["assignments"] += read_store_section(store, index["completed"], max_items=limit)
+                except json.JSONDecodeError:
+                    index = None
+
+    if index is None:
+        # Files written before the indexed layout (or with offsets that no longer match, e.g. rewritten
+        # with "\r\n" line endings) are read whole; the next save rewrites them indexed.
+        return project_state(load_local_shared_state(store_path), projections, limit)
+
+    view = project_state(normalize_state(state), projections, limit)
+    view["completed_count"] = index["completed"][2]
+    return view
+
+
+def load_local_changes(since_version, store_path=STORE_PATH):
+    lock_path, changes_path = store_sidecar_paths(store_path)
+    ensure_store_exists(store_path)
+    with FileLock(lock_path, timeout=5):
+        try:
+            feed = json.loads(changes_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            feed = None
 
+    if isinstance(feed, dict) and isinstance(feed.get("version"), int) and isinstance(feed.get("changes"), list):
+        changes = changes_since(feed["version"], feed["changes"], since_version)
+        if changes is not None:
+            return {"version": feed["version"], "changes": changes}
+
+    state = load_local_shared_state(store_path)
+    if feed is None:
+        with FileLock(lock_path, timeout=5):
+            changes_path.write_text(json.dumps({"version": state["version"], "changes": state["changes"]}), encoding="utf-8")
+    return {"version": state["version"], "resync": True}
 
-def load_supabase_state(sync_config):
-    client = get_supabase_client(sync_config["supabase_url"], sync_config["supabase_key"])
-    app_id = sync_config["app_id"]
 
-    response = run_with_retries(lambda: client.table("spinner_state").select("state").eq("id", app_id).limit(1).execute())
+async def load_supabase_state_async(client, app_id):
+    response = await run_with_retries(lambda: client.table("spinner_state").select("state").eq("id", app_id).limit(1).execute())
     if response.data:
         return normalize_state(response.data[0].get("state"))
 
     state = default_shared_state()
-    run_with_retries(lambda: client.table("spinner_state").upsert({
+    await run_with_retries(lambda: client.table("spinner_state").upsert({
         "id": app_id,
         "state": state
     }).execute())
-    return state
+    return normalize_state(state)
 
 
-def save_supabase_state(sync_config, state):
-    client = get_supabase_client(sync_config["supabase_url"], sync_config["supabase_key"])
-    app_id = sync_config["app_id"]
+async def load_supabase_changes_async(client, app_id, since_version, use_rpc=True):
+    if use_rpc:
+        # The server filters the log, so an idle poll transfers only the version and an empty list.
+        response = await run_with_retries(lambda: client.rpc("changes_since", {
+            "p_id": app_id,
+            "p_since": int(since_version)
+        }).execute())
+        feed = response.data if isinstance(response.data, dict) else None
+    else:
+        response = await run_with_retries(lambda: client.table("spinner_state").select(
+            "version:state->version, changes:state->changes"
+        ).eq("id", app_id).limit(1).execute())
+        feed = response.data[0] if response.data else None
+    if feed:
+        version = feed.get("version") if feed.get("version") is not None else 0
+        changes = feed.get("changes") if feed.get("changes") is not None else []
+        if isinstance(version, int) and isinstance(changes, list):
+            changes = changes_since(version, changes, since_version)
+            if changes is not None:
+                return {"version": version, "changes": changes}
+
+    return {"resync": True}
+
+
+def projection_state(row):
+    # Missing JSON paths come back as null; drop them so normalize_state fills the defaults.
+    return normalize_state({key: value for key, value in row.items() if value is not None})
+
+
+async def load_supabase_projection_async(client, app_id, projections, limit, use_rpc=True):
+    if use_rpc:
+        response = await run_with_retries(lambda: client.rpc("load_state_projection", {
+            "p_id": app_id,
+            "p_sections": list(projections),
+            "p_limit": int(limit)
+        }).execute())
+        payload = response.data
+        if isinstance(payload, dict):
+            row = dict(payload)
+            row["assignments"] = (row.pop("pending", None) or []) + (row.pop("completed", None) or [])
+            completed_count = row.pop("completed_count", None) or 0
+            view = project_state(projection_state(row), projections, limit)
+            view["completed_count"] = int(completed_count)
+            return view
+    else:
+        columns = [PROJECTION_META_SELECT]
+        if "options" in projections:
+            columns.append("options:state->options")
+        if any(name in projections for name in ("pending", "leaderboard", "completed")):
+            columns.append("assignments:state->assignments")
+        response = await run_with_retries(
+            lambda: client.table("spinner_state").select(", ".join(columns)).eq("id", app_id).limit(1).execute()
+        )
+        if response.data:
+            return project_state(projection_state(response.data[0]), projections, limit)
+
+    # No row yet: the full loader creates it.
+    return project_state(await load_supabase_state_async(client, app_id), projections, limit)
+
+
+async def save_supabase_state_async(client, app_id, state):
     state = normalize_state(state)
     state["updated_at"] = time.time()
-    run_with_retries(lambda: client.table("spinner_state").upsert({
+    payload = state_to_json(state)
+    await run_with_retries(lambda: client.table("spinner_state").upsert({
         "id": app_id,
-        "state": state
+        "state": payload
     }).execute())
 
 
-def spin_supabase_once(sync_config):
-    client = get_supabase_client(sync_config["supabase_url"], sync_config["supabase_key"])
-    app_id = sync_config["app_id"]
-
-    response = run_with_retries(lambda: client.rpc("spin_once", {"p_id": app_id}).execute())
+async def spin_supabase_once_async(client, app_id):
+    response = await run_with_retries(lambda: client.rpc("spin_once", {"p_id": app_id}).execute())
     payload = response.data
 
     if payload is None:
@@ -257,11 +898,9 @@ def spin_supabase_once(sync_config):
     }
 
 
-def submit_supabase_completion_once(sync_config, spin_id, team_name):
-    client = get_supabase_client(sync_config["supabase_url"], sync_config["supabase_key"])
-
-    response = run_with_retries(lambda: client.rpc("submit_completion_once", {
-        "p_id": sync_config["app_id"],
+async def submit_supabase_completion_once_async(client, app_id, spin_id, team_name):
+    response = await run_with_retries(lambda: client.rpc("submit_completion_once", {
+        "p_id": app_id,
         "p_spin_id": int(spin_id),
         "p_team_name": str(team_name)
     }).execute())
@@ -283,6 +922,82 @@ def submit_supabase_completion_once(sync_config, spin_id, team_name):
     return False, str(payload.get("message") or "Completion failed.")
 
 
+async def timed_cloud_call(call):
+    started = time.perf_counter()
+    await call
+    return (time.perf_counter() - started) * 1000
+
+
+def load_supabase_state(sync_config):
+    return run_cloud(sync_config, lambda client: load_supabase_state_async(client, sync_config["app_id"]))
+
+
+def load_supabase_changes(sync_config, since_version):
+    runtime = get_cloud_runtime()
+    if runtime["changes_rpc"]:
+        try:
+            return run_cloud(
+                sync_config,
+                lambda client: load_supabase_changes_async(client, sync_config["app_id"], since_version)
+            )
+        except Exception as error:
+            if not is_missing_changes_rpc_error(error):
+                raise
+            runtime["changes_rpc"] = False
+    return run_cloud(
+        sync_config,
+        lambda client: load_supabase_changes_async(client, sync_config["app_id"], since_version, use_rpc=False)
+    )
+
+
+def load_supabase_projection(sync_config, projections, limit=LEADERBOARD_TOP_K):
+    runtime = get_cloud_runtime()
+    if runtime["projection_rpc"]:
+        try:
+            return run_cloud(
+                sync_config,
+                lambda client: load_supabase_projection_async(client, sync_config["app_id"], projections, limit)
+            )
+        except Exception as error:
+            if not is_missing_projection_rpc_error(error):
+                raise
+            runtime["projection_rpc"] = False
+    return run_cloud(
+        sync_config,
+        lambda client: load_supabase_projection_async(client, sync_config["app_id"], projections, limit, use_rpc=False)
+    )
+
+
+def save_supabase_state(sync_config, state):
+    return run_cloud(sync_config, lambda client: save_supabase_state_async(client, sync_config["app_id"], state))
+
+
+def spin_supabase_once(sync_config):
+    return run_cloud(sync_config, lambda client: spin_supabase_once_async(client, sync_config["app_id"]))
+
+
+def submit_supabase_completion_once(sync_config, spin_id, team_name):
+    return run_cloud(
+        sync_config,
+        lambda client: submit_supabase_completion_once_async(client, sync_config["app_id"], spin_id, team_name)
+    )
+
+
+def check_cloud_connection(sync_config):
+    # Independent reads run concurrently on the shared client; each reports its own latency or error.
+    app_id = sync_config["app_id"]
+    checks = {
+        "State read": lambda client: timed_cloud_call(load_supabase_state_async(client, app_id)),
+        "Change feed read": lambda client: timed_cloud_call(
+            load_supabase_changes_async(client, app_id, 0, use_rpc=get_cloud_runtime()["changes_rpc"])
+        )
+    }
+    started = time.perf_counter()
+    results = run_cloud_operations(sync_config, list(checks.values()), return_exceptions=True)
+    total_ms = (time.perf_counter() - started) * 1000
+    return dict(zip(checks.keys(), results)), total_ms
+
+
 def is_missing_spin_rpc_error(error):
     message = str(error)
     return "PGRST202" in message or "Could not find the function public.spin_once" in message
@@ -293,223 +1008,1021 @@ def is_missing_submit_rpc_error(error):
     return "PGRST202" in message or "Could not find the function public.submit_completion_once" in message
 
 
-def load_shared_state(require_cloud=False):
+def is_missing_projection_rpc_error(error):
+    message = str(error)
+    return "PGRST202" in message or "Could not find the function public.load_state_projection" in message
+
+
+def is_missing_changes_rpc_error(error):
+    message = str(error)
+    return "PGRST202" in message or "Could not find the function public.changes_since" in message
+
+
+@st.cache_resource
+def get_cloud_health():
+    return {"offline_until": 0.0, "last_error": None}
+
+
+def cloud_is_available():
+    return time.time() >= get_cloud_health()["offline_until"]
+
+
+def mark_cloud_failure(error):
+    health = get_cloud_health()
+    health["offline_until"] = time.time() + CLOUD_RETRY_SECONDS
+    health["last_error"] = str(error)
+
+
+def mark_cloud_success():
+    get_cloud_health()["offline_until"] = 0.0
+
+
+def write_behind_paths(store_path=STORE_PATH):
+    journal_path = store_path.parent / WRITE_BEHIND_PATH.name
+    return journal_path, str(journal_path) + ".lock"
+
+
+def pending_write_behind_count(store_path=STORE_PATH):
+    journal_path, _ = write_behind_paths(store_path)
+    try:
+        if journal_path.stat().st_size == 0:
+            return 0
+        with journal_path.open("r", encoding="utf-8") as journal:
+            return sum(1 for line in journal if line.strip())
+    except OSError:
+        return 0
+
+
+def append_write_behind(entries, store_path=STORE_PATH):
+    journal_path, lock_path = write_behind_paths(store_path)
+    queued_at = time.time()
+    lines = []
+    for op, args, local_spin_id in entries:
+        entry = {"op": op, "args": args, "queued_at": queued_at, "op_id": uuid.uuid4().hex}
+        if local_spin_id is not None:
+            entry["local_spin_id"] = local_spin_id
+        lines.append(json.dumps(entry) + "\n")
+    if not lines:
+        return
+
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(lock_path, timeout=5):
+        with journal_path.open("a", encoding="utf-8") as journal:
+            journal.writelines(lines)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+
+def read_write_behind(store_path=STORE_PATH):
+    journal_path, _ = write_behind_paths(store_path)
+    try:
+        lines = journal_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict) and entry.get("op") in SHARED_OPERATIONS and isinstance(entry.get("args"), dict):
+            entries.append(entry)
+    return entries
+
+
+def write_write_behind(entries, store_path=STORE_PATH):
+    # Write the remaining queue aside and swap it in, so a crash mid-write never leaves a torn journal.
+    journal_path, _ = write_behind_paths(store_path)
+    payload = "".join(json.dumps(entry) + "\n" for entry in entries)
+    temp_path = journal_path.with_name(journal_path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as journal:
+        journal.write(payload)
+        journal.flush()
+        os.fsync(journal.fileno())
+    os.replace(temp_path, journal_path)
+
+
+def local_mirror_version(store_path=STORE_PATH):
+    _, changes_path = store_sidecar_paths(store_path)
+    try:
+        return json.loads(changes_path.read_text(encoding="utf-8")).get("version")
+    except (json.JSONDecodeError, OSError, AttributeError):
+        return None
+
+
+def mirror_local_snapshot(state, force=False, store_path=STORE_PATH):
+    # The local file doubles as the offline view of the cloud state; never overwrite queued offline changes.
+    if not force and pending_write_behind_count(store_path):
+        return
+    if force or local_mirror_version(store_path) != state.get("version"):
+        save_local_shared_state(state_to_json(state), store_path)
+
+
+def mirror_local_changes(sync_config, version, changes=()):
+    # Polling only sees deltas and projections, so the offline view is brought up to `version` from the change
+    # log: the polled delta when it starts where the local file ends, otherwise the missing range, and a full
+    # snapshot only when the log no longer covers the gap.
+    if pending_write_behind_count():
+        return
+    local_version = local_mirror_version()
+    if local_version == version:
+        return
+
+    try:
+        if isinstance(local_version, int) and local_version < version:
+            changes = list(changes)
+            if not changes or changes[0].get("seq") != local_version + 1:
+                feed = load_supabase_changes(sync_config, local_version)
+                changes = [] if feed.get("resync") else feed["changes"]
+            if changes:
+                state = load_local_shared_state()
+                if state["version"] == local_version:
+                    for change in changes:
+                        apply_change(state, change)
+                    state["changes"] = (state["changes"] + changes)[-CHANGE_LOG_LIMIT:]
+                    save_local_shared_state(state_to_json(state))
+                    return
+
+        mirror_local_snapshot(load_supabase_state(sync_config), force=True)
+    except Timeout:
+        # Another session holds the local store; the next poll catches up.
+        return
+
+
+def replay_write_behind_entry(state, entry, spin_ids):
+    op = entry["op"]
+    args = dict(entry["args"])
+
+    # The cloud save can succeed after the caller has given up on it, leaving the entry in the journal;
+    # the applied op ids saved with the state make the next replay skip it instead of applying it twice.
+    op_id = entry.get("op_id")
+    if op_id in state["applied_ops"]:
+        if op == "spin":
+            spin_ids[entry.get("local_spin_id")] = state["applied_ops"][op_id]
+        return None
+    conflict = apply_write_behind_entry(state, op, args, entry, spin_ids)
+    if op_id:
+        state["applied_ops"][op_id] = spin_ids.get(entry.get("local_spin_id")) if op == "spin" else None
+    return conflict
+
+
+def apply_write_behind_entry(state, op, args, entry, spin_ids):
+    if op == "spin":
+        local_spin_id = entry.get("local_spin_id")
+        result = apply_spin(state, **args)
+        spin_ids[local_spin_id] = result["spin_id"] if result else None
+        if result is None:
+            return f"offline spin #{local_spin_id} ({args.get('winner_name')}) was dropped: no uses left in cloud"
+        return None
+
+    if op == "completion":
+        if args["spin_id"] in spin_ids:
+            args["spin_id"] = spin_ids[args["spin_id"]]
+        if args["spin_id"] is None:
+            return "completion for a dropped offline spin was discarded"
+        ok, message = apply_completion(state, **args)
+        return None if ok else f"completion for spin #{args['spin_id']} skipped: {message}"
+
+    if op == "add_option":
+        ok, message = apply_add_option(state, **args)
+        return None if ok else f"queued option skipped: {message}"
+
+    SHARED_OPERATIONS[op](state, **args)
+    return None
+
+
+def replay_write_behind(sync_config, store_path=STORE_PATH):
+    # Replay queued offline operations in order, one cloud load/save per batch.
+    if not pending_write_behind_count(store_path):
+        return None
+
+    # Never wait for another session's replay: it holds the lock across cloud round trips, and a timeout here
+    # would be mistaken for a cloud failure by the caller. That session flushes the queue for everyone.
+    journal_lock = FileLock(write_behind_paths(store_path)[1])
+    try:
+        journal_lock.acquire(blocking=False)
+    except Timeout:
+        return None
+
+    report = {"applied": 0, "conflicts": []}
+    spin_ids = {}
+    try:
+        entries = read_write_behind(store_path)
+        state = None
+        while entries:
+            batch = entries[:WRITE_BEHIND_BATCH_SIZE]
+            state = load_supabase_state(sync_config)
+            for entry in batch:
+                conflict = replay_write_behind_entry(state, entry, spin_ids)
+                if conflict:
+                    report["conflicts"].append(conflict)
+                else:
+                    report["applied"] += 1
+            save_supabase_state(sync_config, state)
+
+            entries = entries[len(batch):]
+            for entry in entries:
+                if entry["op"] == "completion" and entry["args"].get("spin_id") in spin_ids:
+                    entry["args"]["spin_id"] = spin_ids[entry["args"]["spin_id"]]
+            write_write_behind(entries, store_path)
+
+        if state is None:
+            write_write_behind([], store_path)
+            return None
+    finally:
+        journal_lock.release()
+
+    mirror_local_snapshot(state, force=True, store_path=store_path)
+    return report
+
+
+def write_behind_message(report):
+    if report["conflicts"]:
+        return (
+            f"Synced {report['applied']} queued offline changes to cloud. "
+            f"Conflicts: {'; '.join(report['conflicts'])}."
+        )
+    return f"Synced {report['applied']} queued offline changes to cloud."
+
+
+def flush_write_behind(sync_config):
+    report = replay_write_behind(sync_config)
+    if report is not None:
+        st.session_state.sync_warning = write_behind_message(report)
+
+
+@st.cache_resource
+def get_trace_recorder():
+    # Process-wide, so one trace covers every session (bursts of spins, idle pollers, submissions).
+    return {"enabled": False, "lock": threading.Lock()}
+
+
+def start_trace_recording():
+    recorder = get_trace_recorder()
+    baseline = load_shared_state()
+    with recorder["lock"]:
+        TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        baseline_entry = {"op": "baseline", "at": time.time(), "state": state_to_json(baseline)}
+        TRACE_PATH.write_text(json.dumps(baseline_entry) + "\n", encoding="utf-8")
+        recorder["enabled"] = True
+
+
+def stop_trace_recording():
+    get_trace_recorder()["enabled"] = False
+
+
+def record_trace(op, at, args, latency_ms, extra=None):
+    recorder = get_trace_recorder()
+    entry = {"op": op, "at": round(at, 4), "args": args, "ms": round(latency_ms, 2)}
+    entry.update(extra or {})
+    line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+    with recorder["lock"]:
+        if recorder["enabled"]:
+            with TRACE_PATH.open("a", encoding="utf-8") as trace:
+                trace.write(line)
+
+
+def read_operation_trace():
+    try:
+        lines = TRACE_PATH.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None, []
+
+    baseline = None
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("op") == "baseline":
+            baseline = entry.get("state")
+        elif isinstance(entry.get("at"), (int, float)) and isinstance(entry.get("args"), dict):
+            entries.append(entry)
+    return baseline, entries
+
+
+def traced(op, describe=None):
+    # `describe` adds fields derived from the call's result, e.g. how far behind a delta read started.
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not get_trace_recorder()["enabled"]:
+                return func(*args, **kwargs)
+            at = time.time()
+            started = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                latency_ms = (time.perf_counter() - started) * 1000
+                bound = dict(signature.bind(*args, **kwargs).arguments)
+                record_trace(op, at, bound, latency_ms, describe(result, bound) if describe else None)
+        return wrapper
+    return decorator
+
+
+def changes_read_lag(feed, args):
+    # Replays start each delta read this many versions behind the scratch store, not at the live version.
+    if isinstance(feed, dict) and isinstance(feed.get("version"), int):
+        return {"lag": feed["version"] - int(args["since_version"])}
+    return None
+
+
+@traced("load_state")
+def load_shared_state():
     sync_config = get_sync_config()
     if sync_config is None:
         st.session_state.sync_backend = "local"
         return load_local_shared_state()
 
-    try:
-        state = load_supabase_state(sync_config)
-        st.session_state.sync_backend = "supabase"
-        return state
-    except Exception as error:
-        if require_cloud:
+    cloud_error = get_cloud_health()["last_error"]
+    if cloud_is_available():
+        try:
+            flush_write_behind(sync_config)
+            state = load_supabase_state(sync_config)
+            mark_cloud_success()
             st.session_state.sync_backend = "supabase"
-            st.session_state.sync_warning = f"Cloud read failed ({error}). Operation was blocked to prevent data loss."
-            raise RuntimeError("Cloud read failed") from error
+            mirror_local_snapshot(state)
+            return state
+        except Exception as error:
+            mark_cloud_failure(error)
+            cloud_error = error
+
+    st.session_state.sync_backend = "local"
+    st.session_state.sync_warning = f"Cloud read unavailable ({cloud_error}). Showing local snapshot for now."
+    return load_local_shared_state()
+
+
+@traced("load_changes", changes_read_lag)
+def load_shared_changes(since_version):
+    sync_config = get_sync_config()
+    if sync_config is None:
         st.session_state.sync_backend = "local"
-        st.session_state.sync_warning = f"Cloud read unavailable ({error}). Showing local snapshot for now."
-        return load_local_shared_state()
+        return load_local_changes(since_version)
 
+    cloud_error = get_cloud_health()["last_error"]
+    if cloud_is_available():
+        try:
+            flush_write_behind(sync_config)
+            feed = load_supabase_changes(sync_config, since_version)
+            mark_cloud_success()
+            st.session_state.sync_backend = "supabase"
+            if not feed.get("resync"):
+                mirror_local_changes(sync_config, feed["version"], feed["changes"])
+            return feed
+        except Exception as error:
+            mark_cloud_failure(error)
+            cloud_error = error
 
-def save_shared_state(state):
+    st.session_state.sync_backend = "local"
+    st.session_state.sync_warning = f"Cloud read unavailable ({cloud_error}). Showing local snapshot for now."
+    if st.session_state.replica_backend == "local":
+        return load_local_changes(since_version)
+    return {"resync": True}
+
+
+@traced("load_view")
+def load_shared_view():
     sync_config = get_sync_config()
     if sync_config is None:
         st.session_state.sync_backend = "local"
-        return save_local_shared_state(state)
+        return load_local_projection(SESSION_VIEW)
+
+    cloud_error = get_cloud_health()["last_error"]
+    if cloud_is_available():
+        try:
+            flush_write_behind(sync_config)
+            view = load_supabase_projection(sync_config, SESSION_VIEW)
+            mark_cloud_success()
+            st.session_state.sync_backend = "supabase"
+            mirror_local_changes(sync_config, view["version"])
+            return view
+        except Exception as error:
+            mark_cloud_failure(error)
+            cloud_error = error
+
+    st.session_state.sync_backend = "local"
+    st.session_state.sync_warning = f"Cloud read unavailable ({cloud_error}). Showing local snapshot for now."
+    return load_local_projection(SESSION_VIEW)
+
 
+def load_projection_from(backend, projections, limit=LEADERBOARD_TOP_K):
+    # No silent local fallback: callers cache the result under the backend they asked for.
+    sync_config = get_sync_config()
+    if backend != "supabase" or sync_config is None:
+        return load_local_projection(projections, limit)
+    if not cloud_is_available():
+        raise RuntimeError(f"Cloud paused after error: {get_cloud_health()['last_error']}")
     try:
-        result = save_supabase_state(sync_config, state)
-        st.session_state.sync_backend = "supabase"
-        return result
+        return load_supabase_projection(sync_config, projections, limit)
     except Exception as error:
-        st.session_state.sync_backend = "supabase"
-        st.session_state.sync_warning = f"Cloud save failed ({error}). Change was not saved to cloud."
-        raise RuntimeError("Cloud save failed") from error
+        mark_cloud_failure(error)
+        raise
+
+
+def sync_shared_state(max_age_seconds=0):
+    # Keep a per-session view (the SESSION_VIEW projection) and pull only the change records it has not seen yet.
+    replica = st.session_state.replica
+    synced_at = st.session_state.replica_synced_at
+    if replica is not None and synced_at is not None and time.monotonic() - synced_at < max_age_seconds:
+        # Fragments polling on the same tick share one fetch instead of each hitting the store.
+        return replica
+
+    st.session_state.replica_synced_at = time.monotonic()
+    if replica is None:
+        replica = load_shared_view()
+        st.session_state.replica = replica
+        st.session_state.replica_backend = st.session_state.sync_backend
+        st.session_state.last_sync_mode = "snapshot"
+        return replica
+
+    feed = load_shared_changes(replica["version"])
+    if feed.get("resync") or st.session_state.replica_backend != st.session_state.sync_backend:
+        replica = load_shared_view()
+        st.session_state.replica = replica
+        st.session_state.replica_backend = st.session_state.sync_backend
+        st.session_state.last_sync_mode = "snapshot"
+        return replica
+
+    for change in feed["changes"]:
+        apply_change(replica, change)
+        if change.get("op") == "assignment_completed":
+            replica["completed_count"] = replica.get("completed_count", 0) + 1
+    trim_view(replica)
+    st.session_state.last_sync_mode = f"delta ({len(feed['changes'])} changes)"
+    return replica
+
+
+def apply_add_option(state, name, description, limit):
+    clean_name = str(name).strip()
+    if not clean_name:
+        return False, "Option name is required."
+
+    options = state["options"]
+    if any(str(opt.get("name", "")).strip().lower() == clean_name.lower() for opt in options):
+        return False, f"'{clean_name}' already exists!"
+
+    option = {
+        "name": clean_name,
+        "description": description,
+        "limit": int(limit),
+        "remaining": int(limit)
+    }
+    options.append(option)
+    record_change(state, "option_added", option=option)
+    return True, f"Added '{clean_name}'"
 
 
-def add_option_shared(name, description, limit):
-    with STATE_OP_LOCK:
+def apply_reset(state):
+    previous_version = state.get("version", 0)
+    state.clear()
+    state.update(default_shared_state())
+    state["version"] = previous_version
+    record_change(state, "reset")
+    return True
+
+
+def apply_spin(state, winner_name=None, assigned_at_ms=None, rng=random):
+    options = state["options"]
+    pool = [index for index, option in enumerate(options) if option.get("remaining", 0) > 0]
+    if winner_name is not None:
+        pool_winners = [index for index in pool if options[index]["name"] == winner_name]
+    else:
+        pool_winners = pool
+
+    if not pool_winners:
+        return None
+
+    winner_index = rng.choice(pool_winners)
+    winner = options[winner_index]
+    labels_for_spin = [options[index]["name"] for index in pool]
+
+    winner["remaining"] = int(winner.get("remaining", 0)) - 1
+    state["spin_id"] = int(state.get("spin_id", 0)) + 1
+
+    spin_assignment = Assignment(
+        state["spin_id"],
+        winner["name"],
+        assigned_at_ms if isinstance(assigned_at_ms, int) else current_time_ms()
+    )
+    if not any(item.spin_id == spin_assignment.spin_id for item in state["assignments"]):
+        state["assignments"].append(spin_assignment)
+    state["latest_result"] = {
+        "name": winner["name"],
+        "description": winner.get("description", ""),
+        "spin_id": state["spin_id"]
+    }
+    record_change(
+        state,
+        "spin",
+        option_index=winner_index,
+        remaining=winner["remaining"],
+        spin_id=state["spin_id"],
+        assignment=spin_assignment.to_json(),
+        latest_result=state["latest_result"]
+    )
+
+    return {
+        "winner_name": winner["name"],
+        "winner_description": winner.get("description", ""),
+        "labels_for_spin": labels_for_spin,
+        "spin_id": state["spin_id"]
+    }
+
+
+def apply_spin_assignment(state, spin_id, option_name, assigned_at_ms=None):
+    if any(item.spin_id == int(spin_id) for item in state["assignments"]):
+        return False
+
+    assignment = Assignment(
+        int(spin_id),
+        str(option_name),
+        assigned_at_ms if isinstance(assigned_at_ms, int) else current_time_ms()
+    )
+    state["assignments"].append(assignment)
+    record_change(state, "assignment_added", assignment=assignment.to_json())
+    return True
+
+
+def apply_latest_result(state, result):
+    existing = state.get("latest_result")
+    if isinstance(existing, dict) and isinstance(existing.get("spin_id"), int) and existing.get("spin_id") >= result["spin_id"]:
+        return False
+
+    state["latest_result"] = {
+        "name": result["name"],
+        "description": str(result.get("description", "")),
+        "spin_id": result["spin_id"]
+    }
+    record_change(state, "latest_result", result=state["latest_result"])
+    return True
+
+
+def apply_completion(state, spin_id, team_name, completed_at_ms=None):
+    next_submission_seq = max(int(state.get("next_submission_seq", 1)), 1)
+    for item in state["assignments"]:
+        if item.spin_id == int(spin_id):
+            if item.completed_at_ms:
+                return False, "This task was already submitted."
+            item.team_name = sys.intern(str(team_name).strip())
+            item.completed_at_ms = completed_at_ms if isinstance(completed_at_ms, int) else current_time_ms()
+            item.submission_seq = next_submission_seq
+            state["next_submission_seq"] = next_submission_seq + 1
+            record_change(
+                state,
+                "assignment_completed",
+                spin_id=item.spin_id,
+                team_name=item.team_name,
+                completed_at_ms=item.completed_at_ms,
+                submission_seq=next_submission_seq
+            )
+            return True, "Completion submitted successfully."
+
+    return False, "Task assignment not found."
+
+
+def apply_spin_followup(state, spin_id, option_name, description, assigned_at_ms=None):
+    recorded = apply_spin_assignment(state, spin_id, option_name, assigned_at_ms)
+    updated = apply_latest_result(state, {"name": option_name, "description": description, "spin_id": spin_id})
+    return recorded or updated
+
+
+SHARED_OPERATIONS = {
+    "add_option": apply_add_option,
+    "reset": apply_reset,
+    "spin": apply_spin,
+    "spin_assignment": apply_spin_assignment,
+    "latest_result": apply_latest_result,
+    "spin_followup": apply_spin_followup,
+    "completion": apply_completion
+}
+
+
+def new_commit_pipeline():
+    return {"writer_lock": threading.Lock(), "queue_lock": threading.Lock(), "pending": [], "committed_version": None}
+
+
+@st.cache_resource
+def get_commit_pipeline():
+    # Process-wide, so every session queues into the same writer instead of a per-rerun lock.
+    return new_commit_pipeline()
+
+
+def apply_commit_batch(state, batch):
+    changed = []
+    for request in batch:
+        version = state["version"]
         try:
-            clean_name = name.strip()
-            if not clean_name:
-                return False, "Option name is required."
-
-            state = load_shared_state(require_cloud=True)
-            options = state.get("options", [])
-            if any(str(opt.get("name", "")).strip().lower() == clean_name.lower() for opt in options):
-                return False, f"'{clean_name}' already exists!"
-
-            options.append({
-                "name": clean_name,
-                "description": description,
-                "limit": int(limit),
-                "remaining": int(limit)
-            })
-            state["options"] = options
-            save_shared_state(state)
-            return True, f"Added '{clean_name}'"
+            request["result"] = SHARED_OPERATIONS[request["op"]](state, **request["args"])
         except Exception as error:
-            return False, f"Failed to add option: {error}"
+            request["error"] = error
+            continue
+        if state["version"] != version:
+            changed.append(request)
+    return changed
 
 
-def reset_shared_state():
-    with STATE_OP_LOCK:
-        save_shared_state(default_shared_state())
+def commit_shared_batch(batch, target):
+    # Runs in whichever session became the writer, so outcomes are handed back instead of
+    # touching st.session_state here.
+    sync_config = target["sync_config"]
+    store_path = target["store_path"]
+    if sync_config is None:
+        state = load_local_shared_state(store_path)
+        if apply_commit_batch(state, batch):
+            save_local_shared_state(state, store_path)
+        target["pipeline"]["committed_version"] = state["version"]
+        for request in batch:
+            request["backend"] = "local"
+        return
 
+    if cloud_is_available():
+        try:
+            report = replay_write_behind(sync_config, store_path)
+            state = load_supabase_state(sync_config)
+            for request in batch:
+                request.pop("result", None)
+                request.pop("error", None)
+            if apply_commit_batch(state, batch):
+                save_supabase_state(sync_config, state)
+                mirror_local_snapshot(state, store_path=store_path)
+            mark_cloud_success()
+            target["pipeline"]["committed_version"] = state["version"]
+            for request in batch:
+                request["backend"] = "supabase"
+                if report is not None:
+                    request["warning"] = write_behind_message(report)
+            return
+        except Exception as error:
+            mark_cloud_failure(error)
+
+    # Cloud is unreachable: apply to the local view now and journal the operations for replay.
+    for request in batch:
+        request.pop("result", None)
+        request.pop("error", None)
+    state = load_local_shared_state(store_path)
+    changed = apply_commit_batch(state, batch)
+    target["pipeline"]["committed_version"] = state["version"]
+    if changed:
+        save_local_shared_state(state, store_path)
+        journal_entries = []
+        for request in changed:
+            journal_args = dict(request["args"])
+            journal_args.pop("rng", None)
+            local_spin_id = None
+            if request["op"] == "spin":
+                journal_args["winner_name"] = request["result"]["winner_name"]
+                local_spin_id = request["result"]["spin_id"]
+            journal_entries.append((request["op"], journal_args, local_spin_id))
+        append_write_behind(journal_entries, store_path)
+    warning = (
+        f"Cloud unavailable ({get_cloud_health()['last_error']}). "
+        f"Change saved locally; {pending_write_behind_count(store_path)} queued for cloud sync."
+    )
+    for request in batch:
+        request["backend"] = "local"
+        request["warning"] = warning
+
+
+def live_write_target():
+    return {
+        "sync_config": get_sync_config(),
+        "store_path": STORE_PATH,
+        "pipeline": get_commit_pipeline(),
+        "spin_rpc": st.session_state.spin_rpc_enabled,
+        "submit_rpc": st.session_state.submit_rpc_enabled
+    }
 
-def spin_shared_once():
-    sync_config = get_sync_config()
-    if sync_config is not None and st.session_state.spin_rpc_enabled:
+
+def run_live_write(write, *args):
+    # The write path below only talks to its target; this session picks up the outcome afterwards.
+    target = live_write_target()
+    try:
+        return write(target, *args)
+    finally:
+        st.session_state.replica_synced_at = None
+        st.session_state.spin_rpc_enabled = target["spin_rpc"]
+        st.session_state.submit_rpc_enabled = target["submit_rpc"]
+        if "backend" in target:
+            st.session_state.sync_backend = target["backend"]
+        if target.get("warning"):
+            st.session_state.sync_warning = target["warning"]
+
+
+def commit_shared_operation(target, op, args):
+    # Group commit: queue the operation, then either wait for the current writer to pick it up
+    # or become the writer and apply everything queued so far with one load and one save.
+    pipeline = target["pipeline"]
+    request = {"op": op, "args": args, "done": False}
+    with pipeline["queue_lock"]:
+        pipeline["pending"].append(request)
+    if target.get("on_queued"):
+        target["on_queued"]()
+
+    with pipeline["writer_lock"]:
+        if not request["done"]:
+            with pipeline["queue_lock"]:
+                batch = pipeline["pending"]
+                pipeline["pending"] = []
+            try:
+                commit_shared_batch(batch, target)
+            except Exception as error:
+                for queued in batch:
+                    queued.setdefault("error", error)
+            finally:
+                for queued in batch:
+                    queued["done"] = True
+
+    if "backend" in request:
+        target["backend"] = request["backend"]
+    if request.get("warning"):
+        target["warning"] = request["warning"]
+    if "error" in request:
+        raise request["error"]
+    if "result" not in request:
+        raise RuntimeError("Shared write was interrupted before it was committed.")
+    return request["result"]
+
+
+def run_shared_operation(op, **args):
+    return run_live_write(commit_shared_operation, op, args)
+
+
+def add_option_on(target, name, description, limit):
+    try:
+        return commit_shared_operation(target, "add_option", {"name": name, "description": description, "limit": int(limit)})
+    except Exception as error:
+        return False, f"Failed to add option: {error}"
+
+
+def spin_once_on(target):
+    sync_config = target["sync_config"]
+    if sync_config is not None and target["spin_rpc"] and cloud_is_available():
         try:
             spin_result = spin_supabase_once(sync_config)
-            st.session_state.sync_backend = "supabase"
+            target["backend"] = "supabase"
             if spin_result is not None:
-                try:
-                    record_spin_assignment(spin_result["spin_id"], spin_result["winner_name"])
-                except Exception as error:
-                    st.session_state.sync_warning = f"Spin recorded, but assignment log failed ({error})."
-                try:
-                    update_latest_result_shared({
-                        "name": spin_result["winner_name"],
-                        "description": spin_result.get("winner_description", ""),
-                        "spin_id": spin_result["spin_id"]
-                    })
-                except Exception as error:
-                    st.session_state.sync_warning = f"Spin saved, but latest-result sync failed ({error})."
+                record_spin_followup(target, spin_result)
             return spin_result
         except Exception as error:
             if is_missing_spin_rpc_error(error):
-                st.session_state.spin_rpc_enabled = False
-                st.session_state.sync_warning = "Atomic cloud RPC not installed. Using standard cloud mode."
+                target["spin_rpc"] = False
+                target["warning"] = "Atomic cloud RPC not installed. Using standard cloud mode."
             else:
-                st.session_state.sync_warning = "Cloud spin RPC unavailable. Using standard cloud mode."
+                mark_cloud_failure(error)
+                target["warning"] = "Cloud spin RPC unavailable. Using standard cloud mode."
 
-    with STATE_OP_LOCK:
-        state = load_shared_state(require_cloud=True)
-        options = state.get("options", [])
-        pool = [index for index, option in enumerate(options) if option.get("remaining", 0) > 0]
+    args = {"assigned_at_ms": current_time_ms()}
+    if target.get("rng") is not None:
+        args["rng"] = target["rng"]
+    return commit_shared_operation(target, "spin", args)
 
-        if not pool:
-            return None
-
-        winner_index = random.choice(pool)
-        winner = options[winner_index]
-        labels_for_spin = [options[index]["name"] for index in pool]
 
-        winner["remaining"] = int(winner.get("remaining", 0)) - 1
-        state["spin_id"] = int(state.get("spin_id", 0)) + 1
+def record_spin_followup(target, spin_result):
+    # Assignment log and latest result live in the same state row, so they are written together in one round trip.
+    try:
+        commit_shared_operation(target, "spin_followup", {
+            "spin_id": int(spin_result["spin_id"]),
+            "option_name": str(spin_result["winner_name"]),
+            "description": str(spin_result.get("winner_description", "")),
+            "assigned_at_ms": current_time_ms()
+        })
+    except Exception as error:
+        target["warning"] = f"Spin recorded, but assignment log failed ({error})."
 
-        spin_assignment = {
-            "spin_id": state["spin_id"],
-            "option_name": winner["name"],
-            "assigned_at_ms": current_time_ms(),
-            "team_name": "",
-            "completed_at_ms": None,
-            "submission_seq": None
-        }
-        assignments = state.get("assignments", [])
-        if not any(item.get("spin_id") == spin_assignment["spin_id"] for item in assignments if isinstance(item, dict)):
-            assignments.append(spin_assignment)
-        state["assignments"] = assignments
-        state["latest_result"] = {
-            "name": winner["name"],
-            "description": winner.get("description", ""),
-            "spin_id": state["spin_id"]
-        }
 
-        save_shared_state(state)
+def submit_completion_on(target, spin_id, team_name):
+    sync_config = target["sync_config"]
+    if sync_config is not None and target["submit_rpc"] and cloud_is_available():
+        try:
+            ok, message = submit_supabase_completion_once(sync_config, spin_id, team_name)
+            target["backend"] = "supabase"
+            return ok, message
+        except Exception as error:
+            if is_missing_submit_rpc_error(error):
+                target["submit_rpc"] = False
+                target["warning"] = "Atomic submit RPC not installed. Using standard submit mode."
+            else:
+                mark_cloud_failure(error)
+                target["warning"] = "Cloud submit RPC unavailable. Using standard submit mode."
 
-        return {
-            "winner_name": winner["name"],
-            "winner_description": winner.get("description", ""),
-            "labels_for_spin": labels_for_spin,
-            "spin_id": state["spin_id"]
-        }
+    try:
+        return commit_shared_operation(target, "completion", {
+            "spin_id": int(spin_id),
+            "team_name": team_name.strip(),
+            "completed_at_ms": current_time_ms()
+        })
+    except Exception as error:
+        return False, f"Submit failed: {error}"
 
 
-def record_spin_assignment(spin_id, option_name):
-    with STATE_OP_LOCK:
-        state = load_shared_state(require_cloud=True)
-        assignments = state.get("assignments", [])
-        if any(item.get("spin_id") == int(spin_id) for item in assignments if isinstance(item, dict)):
-            return
+@traced("add_option")
+def add_option_shared(name, description, limit):
+    return run_live_write(add_option_on, name, description, limit)
 
-        assignments.append({
-            "spin_id": int(spin_id),
-            "option_name": str(option_name),
-            "assigned_at_ms": current_time_ms(),
-            "team_name": "",
-            "completed_at_ms": None,
-            "submission_seq": None
-        })
-        state["assignments"] = assignments
-        try:
-            save_shared_state(state)
-        except Exception as error:
-            st.session_state.sync_warning = f"Assignment log save failed ({error})."
 
+@traced("reset")
+def reset_shared_state():
+    run_shared_operation("reset")
 
-def update_latest_result_shared(result):
-    if not isinstance(result, dict):
-        return
 
-    spin_id = result.get("spin_id")
-    name = str(result.get("name", "")).strip()
-    if not isinstance(spin_id, int) or not name:
-        return
+@traced("spin")
+def spin_shared_once():
+    return run_live_write(spin_once_on)
 
-    with STATE_OP_LOCK:
-        state = load_shared_state(require_cloud=True)
-        existing = state.get("latest_result")
-        if isinstance(existing, dict) and isinstance(existing.get("spin_id"), int) and existing.get("spin_id") >= spin_id:
-            return
 
-        state["latest_result"] = {
-            "name": name,
-            "description": str(result.get("description", "")),
-            "spin_id": spin_id
+@traced("completion")
+def submit_completion(spin_id, team_name):
+    return run_live_write(submit_completion_on, spin_id, team_name)
+
+
+def replay_storage(backend, sync_config=None, rng=None):
+    # Writes go through the same group commit, RPCs and write-behind queue as live ones, just aimed at scratch
+    # storage (with its own local mirror and journal next to REPLAY_STORE_PATH).
+    target = {
+        "sync_config": None,
+        "store_path": REPLAY_STORE_PATH,
+        "pipeline": new_commit_pipeline(),
+        "spin_rpc": False,
+        "submit_rpc": False,
+        "rng": rng
+    }
+    if backend == "local":
+        return {
+            "load_state": lambda: load_local_shared_state(REPLAY_STORE_PATH),
+            "load_view": lambda: load_local_projection(SESSION_VIEW, store_path=REPLAY_STORE_PATH),
+            "load_changes": lambda since_version: load_local_changes(since_version, REPLAY_STORE_PATH),
+            "save_state": lambda state: save_local_shared_state(state, REPLAY_STORE_PATH),
+            "target": target,
+            "scratch": {"version": 0}
         }
-        save_shared_state(state)
+
+    # A scratch row next to the live one, so a replay never touches real data.
+    scratch_config = dict(sync_config, app_id=f"{sync_config['app_id']}-replay")
+    target.update(
+        sync_config=scratch_config,
+        spin_rpc=st.session_state.spin_rpc_enabled,
+        submit_rpc=st.session_state.submit_rpc_enabled
+    )
+    return {
+        "load_state": lambda: load_supabase_state(scratch_config),
+        "load_view": lambda: load_supabase_projection(scratch_config, SESSION_VIEW),
+        "load_changes": lambda since_version: load_supabase_changes(scratch_config, since_version),
+        "save_state": lambda state: save_supabase_state(scratch_config, state),
+        "target": target,
+        "scratch": {"version": 0}
+    }
 
 
-def submit_completion(spin_id, team_name):
-    sync_config = get_sync_config()
-    if sync_config is not None and st.session_state.submit_rpc_enabled:
+def note_scratch_version(storage, version):
+    if isinstance(version, int):
+        scratch = storage["scratch"]
+        scratch["version"] = max(scratch["version"], version)
+
+
+def replay_trace_entry(storage, entry, target):
+    op = entry["op"]
+    args = entry["args"]
+    if op == "load_state":
+        note_scratch_version(storage, storage["load_state"]()["version"])
+        return
+    if op == "load_view":
+        note_scratch_version(storage, storage["load_view"]()["version"])
+        return
+    if op == "load_changes":
+        lag = entry.get("lag")
+        since_version = storage["scratch"]["version"] - lag if isinstance(lag, int) else int(args.get("since_version", 0))
+        note_scratch_version(storage, storage["load_changes"](max(since_version, 0)).get("version"))
+        return
+
+    ok, message = True, None
+    if op == "spin":
+        spin_once_on(target)
+    elif op == "completion":
+        ok, message = submit_completion_on(target, int(args["spin_id"]), str(args["team_name"]))
+    elif op == "add_option":
+        ok, message = add_option_on(target, args["name"], args.get("description", ""), args["limit"])
+    elif op == "reset":
+        commit_shared_operation(target, "reset", {})
+    note_scratch_version(storage, target["pipeline"]["committed_version"])
+    if not ok:
+        raise RuntimeError(message)
+
+
+def latency_summary(values):
+    if not values:
+        return None, None
+    values = np.asarray(values, dtype=np.float64)
+    return float(values.mean()), float(np.percentile(values, 95))
+
+
+def replay_operation_trace(baseline, entries, backend, speed=1, seed=0, sync_config=None):
+    storage = replay_storage(backend, sync_config, random.Random(seed))
+    baseline = normalize_state(baseline if isinstance(baseline, dict) else default_shared_state())
+    storage["save_state"](baseline)
+    storage["scratch"]["version"] = baseline["version"]
+    if backend != "local":
+        mirror_local_snapshot(baseline, force=True, store_path=REPLAY_STORE_PATH)
+    if pending_write_behind_count(REPLAY_STORE_PATH):
+        write_write_behind([], REPLAY_STORE_PATH)
+    entries = sorted(entries, key=lambda entry: entry["at"])
+    first_at = entries[0]["at"]
+
+    # Reads run concurrently like real pollers. Writes enter the commit queue strictly in trace order (each
+    # one as soon as the previous has been queued), so group commit can still batch them and the seeded RNG
+    # picks the same winners on every replay regardless of speed.
+    write_turn = {"next": 0, "condition": threading.Condition()}
+    write_seq = {}
+    for entry in entries:
+        if not entry["op"].startswith("load_"):
+            write_seq[id(entry)] = len(write_seq)
+
+    def run_entry(entry):
+        seq = write_seq.get(id(entry))
+        started = time.perf_counter()
+        failed = False
         try:
-            ok, message = submit_supabase_completion_once(sync_config, spin_id, team_name)
-            st.session_state.sync_backend = "supabase"
-            return ok, message
-        except Exception as error:
-            if is_missing_submit_rpc_error(error):
-                st.session_state.submit_rpc_enabled = False
-                st.session_state.sync_warning = "Atomic submit RPC not installed. Using standard submit mode."
+            if seq is None:
+                replay_trace_entry(storage, entry, storage["target"])
             else:
-                st.session_state.sync_warning = "Cloud submit RPC unavailable. Using standard submit mode."
+                with write_turn["condition"]:
+                    write_turn["condition"].wait_for(lambda: write_turn["next"] == seq)
+                released = []
+
+                def release_turn():
+                    with write_turn["condition"]:
+                        if not released:
+                            released.append(True)
+                            write_turn["next"] += 1
+                            write_turn["condition"].notify_all()
+
+                entry_target = dict(storage["target"])
+                # An RPC spin commits on the server before its follow-up is queued, so the next write waits for
+                # the whole spin instead of racing the follow-up's load and save.
+                if not (entry["op"] == "spin" and entry_target["sync_config"] is not None and entry_target["spin_rpc"]):
+                    entry_target["on_queued"] = release_turn
+                try:
+                    replay_trace_entry(storage, entry, entry_target)
+                finally:
+                    release_turn()
+        except Exception:
+            failed = True
+        return entry["op"], (time.perf_counter() - started) * 1000, failed
+
+    replay_started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=REPLAY_WORKERS, thread_name_prefix="trace-replay") as pool:
+        futures = []
+        for entry in entries:
+            if speed > 0:
+                delay = (entry["at"] - first_at) / speed - (time.perf_counter() - replay_started)
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(run_entry, entry))
+        results = [future.result() for future in futures]
+    replay_seconds = max(time.perf_counter() - replay_started, 1e-9)
+    trace_seconds = max(entries[-1]["at"] - first_at, 1e-9)
+
+    recorded = collections.defaultdict(list)
+    replayed = collections.defaultdict(list)
+    failures = collections.Counter()
+    for entry in entries:
+        if isinstance(entry.get("ms"), (int, float)):
+            recorded[entry["op"]].append(entry["ms"])
+    for op, latency_ms, failed in results:
+        replayed[op].append(latency_ms)
+        failures[op] += failed
+
+    rows = []
+    for op in sorted(replayed):
+        recorded_mean, recorded_p95 = latency_summary(recorded[op])
+        replay_mean, replay_p95 = latency_summary(replayed[op])
+        rows.append({
+            "Operation": op,
+            "Count": len(replayed[op]),
+            "Recorded mean (ms)": round(recorded_mean, 1) if recorded_mean is not None else None,
+            "Replay mean (ms)": round(replay_mean, 1),
+            "Recorded p95 (ms)": round(recorded_p95, 1) if recorded_p95 is not None else None,
+            "Replay p95 (ms)": round(replay_p95, 1),
+            "Mean change": f"{replay_mean / recorded_mean - 1:+.0%}" if recorded_mean else "-",
+            "Errors": failures[op]
+        })
+
+    return {
+        "rows": rows,
+        "operations": len(entries),
+        "trace_seconds": trace_seconds,
+        "replay_seconds": replay_seconds,
+        "recorded_throughput": len(entries) / trace_seconds,
+        "replay_throughput": len(entries) / replay_seconds
+    }
 
-    with STATE_OP_LOCK:
-        try:
-            state = load_shared_state(require_cloud=True)
-            assignments = state.get("assignments", [])
-            next_submission_seq = int(state.get("next_submission_seq", 1))
-            if next_submission_seq < 1:
-                next_submission_seq = 1
-            for item in assignments:
-                if isinstance(item, dict) and item.get("spin_id") == int(spin_id):
-                    if item.get("completed_at_ms"):
-                        return False, "This task was already submitted."
-                    item["team_name"] = team_name.strip()
-                    item["completed_at_ms"] = current_time_ms()
-                    item["submission_seq"] = next_submission_seq
-                    state["next_submission_seq"] = next_submission_seq + 1
-                    state["assignments"] = assignments
-                    save_shared_state(state)
-                    return True, "Completion submitted successfully."
-
-            return False, "Task assignment not found."
-        except Exception as error:
-            return False, f"Submit failed: {error}"
 
 # Initialize session state for options if it doesn't exist
 if 'last_result' not in st.session_state:
@@ -527,6 +2040,15 @@ if 'pending_wheel_animation' not in st.session_state:
 if 'pending_spin_started_at_ms' not in st.session_state:
     st.session_state.pending_spin_started_at_ms = None
 
+if 'spin_notice' not in st.session_state:
+    st.session_state.spin_notice = None
+
+if 'wheel_benchmark_id' not in st.session_state:
+    st.session_state.wheel_benchmark_id = None
+
+if 'wheel_benchmark' not in st.session_state:
+    st.session_state.wheel_benchmark = None
+
 if 'sync_backend' not in st.session_state:
     st.session_state.sync_backend = "local"
 
@@ -539,23 +2061,49 @@ if 'spin_rpc_enabled' not in st.session_state:
 if 'submit_rpc_enabled' not in st.session_state:
     st.session_state.submit_rpc_enabled = True
 
-shared_state = load_shared_state()
-shared_options = shared_state["options"]
+if 'replica' not in st.session_state:
+    st.session_state.replica = None
 
-shared_latest_result = shared_state.get("latest_result")
-session_latest_result = st.session_state.last_result
-if isinstance(shared_latest_result, dict):
-    shared_spin_id = shared_latest_result.get("spin_id") if isinstance(shared_latest_result.get("spin_id"), int) else -1
-    session_spin_id = session_latest_result.get("spin_id") if isinstance(session_latest_result, dict) and isinstance(session_latest_result.get("spin_id"), int) else -1
-    if shared_spin_id > session_spin_id:
-        st.session_state.last_result = {
-            "name": shared_latest_result.get("name"),
-            "description": shared_latest_result.get("description", ""),
-            "spin_id": shared_spin_id
-        }
+if 'replica_backend' not in st.session_state:
+    st.session_state.replica_backend = None
+
+if 'last_sync_mode' not in st.session_state:
+    st.session_state.last_sync_mode = None
+
+if 'planner_result' not in st.session_state:
+    st.session_state.planner_result = None
+
+if 'planner_signature' not in st.session_state:
+    st.session_state.planner_signature = None
+
+if 'replica_synced_at' not in st.session_state:
+    st.session_state.replica_synced_at = None
 
-if not st.session_state.pending_wheel_animation:
-    st_autorefresh(interval=3000, key="sync-refresh")
+if 'reveal_result_pending' not in st.session_state:
+    st.session_state.reveal_result_pending = False
+
+
+def result_spin_id(result):
+    if isinstance(result, dict) and isinstance(result.get("spin_id"), int):
+        return result["spin_id"]
+    return -1
+
+
+def merge_latest_result(state):
+    shared_latest_result = state.get("latest_result")
+    if isinstance(shared_latest_result, dict):
+        shared_spin_id = result_spin_id(shared_latest_result)
+        if shared_spin_id > result_spin_id(st.session_state.last_result):
+            st.session_state.last_result = {
+                "name": shared_latest_result.get("name"),
+                "description": shared_latest_result.get("description", ""),
+                "spin_id": shared_spin_id
+            }
+
+
+shared_state = sync_shared_state()
+shared_options = shared_state["options"]
+merge_latest_result(shared_state)
 
 def get_smtp_config():
     try:
@@ -602,119 +2150,281 @@ def is_valid_email(value):
     return re.match(pattern, value) is not None
 
 
-def render_wheel(labels, winner_name=None, animate=False, spin_key=0):
-        if not labels:
-                st.info("Add options to see the wheel.")
-                return
-
-        winner_index = labels.index(winner_name) if winner_name in labels else 0
-        labels_json = json.dumps(labels)
-        animate_js = "true" if animate else "false"
-        wheel_id = f"wheel-{spin_key}-{len(labels)}"
-
-        wheel_html = f"""
-        <div style="display:flex; flex-direction:column; align-items:center; gap:8px;">
-            <div style="position:relative; width:340px; height:340px;">
-                <div style="position:absolute; top:-2px; left:50%; transform:translateX(-50%); width:0; height:0;
-                                        border-left:14px solid transparent; border-right:14px solid transparent;
-                                        border-top:26px solid #111827; z-index:10;"></div>
-                <canvas id="{wheel_id}" width="340" height="340"></canvas>
-            </div>
-            <div style="font-size:13px; color:#6B7280;">{('Spinning...' if animate else 'Ready to spin')}</div>
-        </div>
-
-        <script>
-            (function() {{
-                const labels = {labels_json};
-                const winnerIndex = {winner_index};
-                const animate = {animate_js};
-                const canvas = document.getElementById("{wheel_id}");
-                const ctx = canvas.getContext("2d");
-                const colors = [
-                    "#60A5FA", "#34D399", "#FBBF24", "#F472B6", "#A78BFA",
-                    "#F87171", "#22D3EE", "#4ADE80", "#FB923C", "#94A3B8"
-                ];
-
-                function drawWheel(rotationDeg) {{
-                    const cx = canvas.width / 2;
-                    const cy = canvas.height / 2;
-                    const radius = 155;
-                    const segment = (Math.PI * 2) / labels.length;
-
-                    ctx.clearRect(0, 0, canvas.width, canvas.height);
-                    ctx.save();
-                    ctx.translate(cx, cy);
-                    ctx.rotate((rotationDeg * Math.PI) / 180);
-
-                    for (let i = 0; i < labels.length; i++) {{
-                        const start = i * segment;
-                        const end = start + segment;
-
-                        ctx.beginPath();
-                        ctx.moveTo(0, 0);
-                        ctx.arc(0, 0, radius, start, end);
-                        ctx.closePath();
-                        ctx.fillStyle = colors[i % colors.length];
-                        ctx.fill();
-                        ctx.lineWidth = 2;
-                        ctx.strokeStyle = "#ffffff";
-                        ctx.stroke();
-
-                        ctx.save();
-                        ctx.rotate(start + segment / 2);
-                        ctx.textAlign = "right";
-                        ctx.fillStyle = "#111827";
-                        ctx.font = "bold 13px sans-serif";
-                        const label = String(labels[i]).slice(0, 16);
-                        ctx.fillText(label, radius - 12, 4);
-                        ctx.restore();
-                    }}
-
-                    ctx.beginPath();
-                    ctx.arc(0, 0, 30, 0, Math.PI * 2);
-                    ctx.fillStyle = "#111827";
-                    ctx.fill();
-                    ctx.fillStyle = "#ffffff";
-                    ctx.font = "bold 12px sans-serif";
-                    ctx.textAlign = "center";
-                    ctx.fillText("SPIN", 0, 4);
-
-                    ctx.restore();
-                }}
-
-                drawWheel(0);
-
-                if (animate && labels.length > 0) {{
-                    const segmentDeg = 360 / labels.length;
-                    const winnerCenterDeg = (winnerIndex + 0.5) * segmentDeg;
-                    const baseOffset = ((270 - winnerCenterDeg) % 360 + 360) % 360;
-                    const target = 2160 + baseOffset;
-                    const duration = 4200;
-                    let start = null;
-
-                    function easeOutCubic(x) {{
-                        return 1 - Math.pow(1 - x, 3);
-                    }}
-
-                    function animateSpin(ts) {{
-                        if (!start) start = ts;
-                        const progress = Math.min((ts - start) / duration, 1);
-                        const eased = easeOutCubic(progress);
-                        drawWheel(target * eased);
-                        if (progress < 1) {{
-                            requestAnimationFrame(animateSpin);
-                        }} else {{
-                            drawWheel(target);
-                        }}
-                    }}
-
-                    requestAnimationFrame(animateSpin);
-                }}
-            }})();
-        </script>
-        """
-
-        components.html(wheel_html, height=390)
+def simulate_depletion(remaining_counts, runs=100_000, seed=None, tail_length=10):
+    # Each active option behaves like an independent rate-1 Poisson clock that stops after
+    # its remaining count, so the next spin is uniform over the active pool exactly as in
+    # spin_shared_once. An option depletes at a Gamma(remaining) time, and its earlier draws
+    # are uniform on [0, depletion time], which lets whole batches of runs be drawn at once.
+    # With few options and many uses, the earlier draws still pending at the k-th depletion are
+    # drawn as one binomial per (k, option) pair instead of one uniform per use. That is exact for
+    # every statistic below, since each reads the spin count at a single depletion rank.
+    counts = np.asarray(remaining_counts, dtype=np.int64)
+    option_count = len(counts)
+    total_spins = int(counts.sum())
+    requested_runs = max(int(runs), 1)
+    if option_count == 0 or total_spins == 0 or np.any(counts < 1):
+        raise ValueError("Depletion simulation needs active options with remaining > 0")
+
+    earlier_draw_count = total_spins - option_count
+    pair_count = option_count * (option_count - 1) // 2
+    use_pairs = pair_count * 6 < earlier_draw_count
+    # Work per run in rough draw units (the per-run sort costs about two per option, a binomial about
+    # six), capped so one plan stays well under a second; the effective run count is reported with the results.
+    run_work = option_count * 2 + (pair_count * 6 if use_pairs else earlier_draw_count)
+    runs = min(requested_runs, max(1, PLANNER_WORK_BUDGET // run_work))
+
+    rng = np.random.default_rng(seed)
+    groups = [(int(count), np.flatnonzero(counts == count)) for count in np.unique(counts)]
+    bin_width = max(1, -(-option_count * total_spins // PLANNER_HISTOGRAM_CELLS))
+    bin_count = -(-total_spins // bin_width)
+    histogram = np.zeros(option_count * bin_count, dtype=np.int64)
+    rank_sum = np.zeros(option_count, dtype=np.float64)
+    first_count = np.zeros(option_count, dtype=np.int64)
+    tail_hits = 0
+    depletion_rank = np.arange(1, option_count + 1, dtype=np.int64)
+    batch_size = max(1, PLANNER_BATCH_ELEMENTS // (max(pair_count, option_count) if use_pairs else total_spins))
+    pair_rank, pair_later = np.triu_indices(option_count, 1)
+    pair_starts = np.flatnonzero(np.r_[True, pair_rank[1:] != pair_rank[:-1]])
+
+    for batch_start in range(0, runs, batch_size):
+        batch = min(batch_size, runs - batch_start)
+        depleted_at = np.empty((batch, option_count), dtype=np.float64)
+        earlier_draws = []
+        for count, columns in groups:
+            group_times = rng.standard_gamma(count, size=(batch, len(columns)))
+            depleted_at[:, columns] = group_times
+            if count > 1 and not use_pairs:
+                draws = rng.random((batch, len(columns), count - 1)) * group_times[:, :, None]
+                earlier_draws.append(draws.reshape(batch, -1))
+
+        order = np.argsort(depleted_at, axis=1)
+        ordered_times = np.take_along_axis(depleted_at, order, axis=1)
+
+        if use_pairs:
+            # At the k-th depletion, each option j still running has used Bin(count_j - 1, t_k / t_j)
+            # of its earlier draws; options already depleted have used all count_j of them.
+            ordered_counts = counts[order]
+            pending = rng.binomial(
+                ordered_counts[:, pair_later] - 1,
+                ordered_times[:, pair_rank] / ordered_times[:, pair_later]
+            )
+            spins = np.cumsum(ordered_counts, axis=1)
+            if pair_count:
+                spins[:, :-1] += np.add.reduceat(pending, pair_starts, axis=1)
+        else:
+            spins = np.broadcast_to(depletion_rank, (batch, option_count)).copy()
+            if earlier_draws:
+                draws = np.concatenate(earlier_draws, axis=1) if len(earlier_draws) > 1 else earlier_draws[0]
+                draws_per_run = draws.shape[1]
+                draws.sort(axis=1)
+                # Offset every run into its own range so one flat searchsorted counts per-run draws.
+                row_offsets = np.arange(batch, dtype=np.float64)[:, None] * (ordered_times[:, -1].max() + 1.0)
+                draws += row_offsets
+                ordered_times += row_offsets
+                positions = np.searchsorted(draws.ravel(), ordered_times.ravel()).reshape(batch, option_count)
+                spins += positions - np.arange(batch, dtype=np.int64)[:, None] * draws_per_run
+
+        histogram += np.bincount(
+            (order * bin_count + (spins - 1) // bin_width).ravel(),
+            minlength=option_count * bin_count
+        )
+        rank_sum += np.bincount(order.ravel(), weights=np.tile(depletion_rank, batch), minlength=option_count)
+        first_count += np.bincount(order[:, 0], minlength=option_count)
+        tail = total_spins - spins[:, -2] if option_count > 1 else np.full(batch, total_spins)
+        tail_hits += int(np.count_nonzero(tail >= tail_length))
+
+    histogram = histogram.reshape(option_count, bin_count)
+    bin_spins = np.minimum(np.arange(1, bin_count + 1) * bin_width, total_spins)
+    weighted_centers = np.minimum(np.arange(bin_count) * bin_width + (bin_width + 1) / 2, total_spins)
+    cumulative = np.cumsum(histogram, axis=1)
+
+    def spin_quantile(fraction):
+        return bin_spins[np.argmax(cumulative >= fraction * runs, axis=1)]
+
+    return {
+        "runs": runs,
+        "requested_runs": requested_runs,
+        "total_spins": total_spins,
+        "tail_length": int(tail_length),
+        "tail_probability": tail_hits / runs,
+        "mean_spin": histogram @ weighted_centers / runs,
+        "p10_spin": spin_quantile(0.1),
+        "median_spin": spin_quantile(0.5),
+        "p90_spin": spin_quantile(0.9),
+        "mean_rank": rank_sum / runs,
+        "first_probability": first_count / runs,
+        "histogram": histogram,
+        "bin_spins": bin_spins
+    }
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_depletion_planner(names, remaining_counts, runs, seed, tail_length):
+    started = time.perf_counter()
+    result = simulate_depletion(remaining_counts, runs=runs, seed=seed, tail_length=tail_length)
+    result["names"] = list(names)
+    result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def build_assignment_frame(assignments):
+    frame = pd.DataFrame({
+        column: [getattr(item, column) for item in assignments]
+        for column in Assignment.__slots__
+    })
+    frame["completed_at_ms"] = pd.to_numeric(frame["completed_at_ms"], errors="coerce")
+    frame["assigned_at_ms"] = pd.to_numeric(frame["assigned_at_ms"], errors="coerce")
+    return frame
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def compute_team_stats(cache_key):
+    # Keyed by (backend, app id, completion history), so each history is loaded and aggregated once across sessions.
+    frame = build_assignment_frame(load_projection_from(cache_key[0], ("completed",))["assignments"])
+    done = frame[frame["completed_at_ms"].notna() & (frame["completed_at_ms"] > 0)].copy()
+    if done.empty:
+        return None
+
+    done["team_name"] = done["team_name"].fillna("").astype(str).str.strip().replace("", "-")
+    completed_at = done["completed_at_ms"].to_numpy(dtype=np.int64)
+    assigned_at = done["assigned_at_ms"].fillna(0).to_numpy(dtype=np.int64)
+    done["duration_ms"] = np.maximum(completed_at - assigned_at, 0)
+
+    by_team = done.groupby("team_name", sort=False)["duration_ms"]
+    summary = pd.DataFrame({
+        "Tasks completed": by_team.size(),
+        "Mean time": by_team.mean(),
+        "Median time": by_team.median(),
+        "P90 time": by_team.quantile(0.9),
+        "Fastest time": by_team.min()
+    })
+    fastest_rows = done.loc[by_team.idxmin()]
+    summary["Fastest task"] = pd.Series(fastest_rows["option_name"].to_numpy(), index=fastest_rows["team_name"].to_numpy())
+    summary = summary.sort_values(["Tasks completed", "Median time"], ascending=[False, True])
+    summary.index.name = "Team"
+
+    span_ms = max(int(completed_at.max() - completed_at.min()), 1)
+    bucket_minutes = max(1, -(-span_ms // (60_000 * TEAM_STATS_MAX_BUCKETS)))
+    done["bucket"] = pd.to_datetime(done["completed_at_ms"], unit="ms").dt.floor(f"{bucket_minutes}min")
+    throughput = done.groupby(["bucket", "team_name"]).size().unstack(fill_value=0).sort_index().cumsum()
+    throughput.index.name = "Time"
+
+    return {
+        "summary": summary.reset_index(),
+        "throughput": throughput,
+        "bucket_minutes": bucket_minutes,
+        "completed": int(len(done))
+    }
+
+
+def get_team_stats(view):
+    if not view.get("completed_count"):
+        return None
+    sync_config = get_sync_config()
+    app_id = sync_config["app_id"] if sync_config else None
+    # Spins bump the state version but not the completions. Completions only grow until a reset, so the count
+    # plus the fastest entries identify the history.
+    history_key = (
+        int(view["completed_count"]),
+        tuple((item.spin_id, item.completed_at_ms) for item in view["assignments"] if item.completed_at_ms)
+    )
+    if st.session_state.sync_backend == "supabase":
+        try:
+            return compute_team_stats(("supabase", app_id) + history_key)
+        except Exception:
+            pass
+    return compute_team_stats(("local", app_id) + history_key)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def summarize_options(cache_key, _options):
+    # Keyed by (backend, app id, state version) like the team stats. A cache_resource hit hands back the same
+    # read-only summary instead of unpickling a copy, and each sort order is just a row-index array into one frame.
+    frame = pd.DataFrame({
+        "Option": pd.Series([opt["name"] for opt in _options], dtype="object"),
+        "Remaining": pd.Series([int(opt["remaining"]) for opt in _options], dtype="int64"),
+        "Limit": pd.Series([int(opt["limit"]) for opt in _options], dtype="int64")
+    })
+    frame["Left"] = frame["Remaining"] / frame["Limit"].clip(lower=1) * 100
+    frame["search_key"] = frame["Option"].str.lower()
+    remaining = frame["Remaining"].to_numpy()
+    by_name = np.argsort(frame["search_key"].to_numpy(), kind="stable")
+    return {
+        "frame": frame,
+        "orders": {
+            "Most remaining": by_name[np.argsort(-remaining[by_name], kind="stable")],
+            "Fewest remaining": by_name[np.argsort(remaining[by_name], kind="stable")],
+            "Name": by_name
+        },
+        "active": int((frame["Remaining"] > 0).sum()),
+        "total": len(frame)
+    }
+
+
+def get_options_summary(view):
+    sync_config = get_sync_config()
+    app_id = sync_config["app_id"] if sync_config else None
+    cache_key = (st.session_state.sync_backend, app_id, int(view.get("version", 0)))
+    return summarize_options(cache_key, view["options"])
+
+
+def render_wheel(labels, winner_name=None, animate=False, spin_key=0, on_landed=None, benchmark_id=None):
+    if not labels:
+        st.info("Add options to see the wheel.")
+        return None
+
+    # The wheel animates in the browser and reports {"landed_spin_id": ...} back when it stops,
+    # or {"benchmark_id": ..., "benchmark": [...]} after a requested render benchmark.
+    winner_index = labels.index(winner_name) if winner_name in labels else 0
+    return wheel_component(
+        labels=labels,
+        winner_index=winner_index,
+        animate=animate,
+        spin_id=spin_key,
+        benchmark_id=benchmark_id,
+        key="spinner_wheel",
+        default=None,
+        on_change=on_landed
+    )
+
+
+def handle_wheel_landed():
+    landed = st.session_state.get("spinner_wheel")
+    wheel_state = st.session_state.last_spin_wheel
+    if isinstance(landed, dict) and landed.get("benchmark_id") == st.session_state.wheel_benchmark_id and "benchmark" in landed:
+        st.session_state.wheel_benchmark = landed["benchmark"]
+        st.session_state.wheel_benchmark_id = None
+        return
+    if isinstance(landed, dict) and isinstance(wheel_state, dict) and landed.get("landed_spin_id") == wheel_state["spin_id"]:
+        st.session_state.pending_wheel_animation = False
+        st.session_state.pending_spin_started_at_ms = None
+        st.session_state.reveal_result_pending = True
+
+
+def handle_spin_click():
+    try:
+        spin_result = spin_shared_once()
+    except Exception as error:
+        st.session_state.spin_notice = ("error", f"Spin failed: {error}")
+        return
+
+    if spin_result is None:
+        st.session_state.spin_notice = ("warning", "No options available to spin.")
+        return
+
+    st.session_state.last_spin_wheel = {
+        'labels': spin_result['labels_for_spin'],
+        'winner_name': spin_result['winner_name'],
+        'spin_id': spin_result['spin_id']
+    }
+    st.session_state.pending_wheel_animation = True
+    st.session_state.last_result = {
+        'name': spin_result['winner_name'],
+        'description': spin_result['winner_description'],
+        'spin_id': spin_result['spin_id']
+    }
+    st.session_state.pending_spin_started_at_ms = current_time_ms()
+    st.session_state['result_email_input'] = ""
 
 # --- Sidebar: Add New Options ---
 with st.sidebar:
@@ -743,6 +2453,86 @@ with st.sidebar:
         st.caption(f"Submit RPC enabled: {st.session_state.submit_rpc_enabled}")
         st.caption(f"Options: {active_count} active / {total_count} total")
         st.caption(f"Spin ID: {shared_state.get('spin_id', 0)}")
+        st.caption(f"Sync version: {shared_state.get('version', 0)} via {st.session_state.last_sync_mode}")
+        st.caption(f"Write-behind queue: {pending_write_behind_count()} pending")
+        if sync_config is not None and not cloud_is_available():
+            st.caption(f"Cloud paused after error: {get_cloud_health()['last_error']}")
+
+        benchmark_count = st.number_input("Benchmark assignments", min_value=1000, value=50_000, step=10_000)
+        if st.button("Run memory benchmark", key="memory_benchmark_btn"):
+            st.dataframe(benchmark_assignment_memory(int(benchmark_count)), hide_index=True)
+
+        if st.button("Benchmark wheel rendering", key="wheel_benchmark_btn", disabled=not active_count):
+            st.session_state.wheel_benchmark_id = current_time_ms()
+            st.session_state.wheel_benchmark = None
+        if st.session_state.wheel_benchmark_id is not None:
+            st.caption("Wheel benchmark runs in the browser; results appear under the wheel.")
+
+        trace_recorder = get_trace_recorder()
+        if trace_recorder["enabled"]:
+            st.caption(f"Recording operation trace to {TRACE_PATH.name}")
+            if st.button("Stop trace recording", key="stop_trace_btn"):
+                stop_trace_recording()
+                st.rerun()
+        elif st.button("Start trace recording", key="start_trace_btn"):
+            start_trace_recording()
+            st.rerun()
+
+        replay_backends = ["local"] if sync_config is None else ["local", "supabase"]
+        replay_backend = st.selectbox(
+            "Replay against",
+            replay_backends,
+            format_func=lambda value: "Local file" if value == "local" else "Cloud (Supabase scratch row)",
+            key="replay_backend"
+        )
+        replay_speed = st.selectbox(
+            "Replay speed",
+            [1, 10, 100, 0],
+            format_func=lambda value: "As fast as possible" if value == 0 else f"{value}x",
+            key="replay_speed"
+        )
+        replay_seed = st.number_input("Replay seed", min_value=0, value=7, step=1, key="replay_seed")
+        if st.button("Replay trace", key="replay_trace_btn", disabled=trace_recorder["enabled"] or not TRACE_PATH.exists()):
+            trace_baseline, trace_entries = read_operation_trace()
+            if not trace_entries:
+                st.info("The trace has no operations yet.")
+            else:
+                with st.spinner("Replaying trace..."):
+                    replay_report = replay_operation_trace(
+                        trace_baseline, trace_entries, replay_backend, int(replay_speed), int(replay_seed), sync_config
+                    )
+                st.caption(
+                    f"{replay_report['operations']} ops. "
+                    f"Recorded: {replay_report['trace_seconds']:.1f} s ({replay_report['recorded_throughput']:.1f} ops/s). "
+                    f"Replay: {replay_report['replay_seconds']:.1f} s ({replay_report['replay_throughput']:.1f} ops/s)."
+                )
+                st.dataframe(replay_report["rows"], hide_index=True)
+
+        st.toggle("Profile reruns", key="profiler_enabled")
+        st.selectbox("Profiler", list(PROFILER_KINDS), format_func=PROFILER_KINDS.get, key="profiler_kind")
+        st.number_input("Keep reruns slower than (ms)", min_value=0, step=100, key="profiler_threshold_ms")
+        if st.query_params.get("profile"):
+            st.caption("Profiling is on for this session via the ?profile= URL parameter.")
+        last_profile = st.session_state.last_profile
+        if last_profile is not None:
+            st.download_button(
+                f"Last profile: {last_profile['label']} ({last_profile['elapsed_ms']:.0f} ms)",
+                data=last_profile["data"],
+                file_name=last_profile["file_name"],
+                mime=last_profile["mime"],
+                key="download_last_profile"
+            )
+            if last_profile.get("fallback"):
+                st.caption("cProfile was busy in another session, so that rerun was sampled instead.")
+        for index, record in enumerate(list(get_profile_store()["profiles"])):
+            captured_text = time.strftime("%H:%M:%S", time.localtime(record["captured_at"]))
+            st.download_button(
+                f"Slow: {record['label']} at {captured_text} ({record['elapsed_ms']:.0f} ms)",
+                data=record["data"],
+                file_name=record["file_name"],
+                mime=record["mime"],
+                key=f"download_slow_profile_{index}"
+            )
 
         test_cloud_btn = st.button(
             "Test cloud connection",
@@ -754,10 +2544,19 @@ with st.sidebar:
             st.caption("Cloud config not set in secrets.")
         elif test_cloud_btn:
             try:
-                _ = load_supabase_state(sync_config)
-                st.success("Cloud connection OK")
+                check_results, check_total_ms = check_cloud_connection(sync_config)
             except Exception as error:
                 st.error(f"Cloud check failed: {error}")
+            else:
+                failed_checks = [f"{name}: {result}" for name, result in check_results.items() if isinstance(result, BaseException)]
+                if failed_checks:
+                    st.error(f"Cloud check failed: {'; '.join(failed_checks)}")
+                else:
+                    st.success("Cloud connection OK")
+                for name, result in check_results.items():
+                    if not isinstance(result, BaseException):
+                        st.caption(f"{name}: {result:.0f} ms")
+                st.caption(f"Total (concurrent): {check_total_ms:.0f} ms")
 
     if get_smtp_config() is None:
         st.warning("SMTP not configured. Add credentials in .streamlit/secrets.toml")
@@ -785,25 +2584,32 @@ with st.sidebar:
         st.rerun()
 
 # --- Main Area: Display Options and Spin ---
+# Sync-sensitive sections are fragments that poll on their own; background refreshes rerun only them,
+# never the sidebar or the email section.
 
-wheel_col, options_col = st.columns([2.2, 1])
+@st.fragment(run_every=SYNC_INTERVAL_SECONDS)
+@profiled("spinner")
+def render_spinner():
+    state = sync_shared_state(max_age_seconds=1)
+    merge_latest_result(state)
+    options = state["options"]
 
-with wheel_col:
     st.subheader("Spinner")
     backend_label = "Cloud (Supabase)" if st.session_state.sync_backend == "supabase" else "Local file"
-    st.caption(f"Auto-sync enabled via {backend_label} (refreshes every 3 seconds).")
+    st.caption(f"Auto-sync enabled via {backend_label} (refreshes every {SYNC_INTERVAL_SECONDS} seconds).")
     if st.session_state.sync_warning:
         st.warning(st.session_state.sync_warning)
         st.session_state.sync_warning = None
-    
-    pool = []
-    for index, opt in enumerate(shared_options):
-        if opt['remaining'] > 0:
-            pool.append(index)
-    
-    can_spin = len(pool) > 0
-
-    active_labels_now = [shared_options[index]['name'] for index in pool]
+
+    active_labels_now = [opt['name'] for opt in options if opt['remaining'] > 0]
+    can_spin = len(active_labels_now) > 0
+
+    if st.session_state.pending_wheel_animation and isinstance(st.session_state.pending_spin_started_at_ms, int):
+        # Fallback if the browser never reports the landing (e.g. the tab was closed mid-spin).
+        if current_time_ms() - st.session_state.pending_spin_started_at_ms > SPIN_ANIMATION_MS + SPIN_LANDING_GRACE_MS:
+            st.session_state.pending_wheel_animation = False
+            st.session_state.pending_spin_started_at_ms = None
+            st.session_state.reveal_result_pending = True
     is_animating_run = st.session_state.pending_wheel_animation and st.session_state.last_spin_wheel is not None
 
     if is_animating_run:
@@ -812,83 +2618,136 @@ with wheel_col:
             labels=wheel_state['labels'],
             winner_name=wheel_state['winner_name'],
             animate=True,
-            spin_key=wheel_state['spin_id']
+            spin_key=wheel_state['spin_id'],
+            on_landed=handle_wheel_landed
         )
         st.caption("Spinning... result will appear once the wheel lands.")
-        elapsed_ms = None
-        if isinstance(st.session_state.pending_spin_started_at_ms, int):
-            elapsed_ms = current_time_ms() - st.session_state.pending_spin_started_at_ms
-
-        refresh_count = st_autorefresh(
-            interval=4300,
-            key=f"spin-finish-{wheel_state['spin_id']}"
+    elif (
+        st.session_state.last_spin_wheel is not None
+        and st.session_state.last_spin_wheel['spin_id'] == state.get("spin_id", 0)
+        and set(active_labels_now) <= set(st.session_state.last_spin_wheel['labels'])
+    ):
+        # Until the next spin (or a new option), keep showing the wheel this session's spin landed on.
+        wheel_state = st.session_state.last_spin_wheel
+        render_wheel(
+            labels=wheel_state['labels'],
+            winner_name=wheel_state['winner_name'],
+            animate=False,
+            spin_key=wheel_state['spin_id'],
+            on_landed=handle_wheel_landed,
+            benchmark_id=st.session_state.wheel_benchmark_id
         )
-        if refresh_count < 1 and (elapsed_ms is None or elapsed_ms < 4300):
-            st.stop()
-        st.session_state.pending_wheel_animation = False
-        st.session_state.pending_spin_started_at_ms = None
-        st.rerun()
     else:
         render_wheel(
             labels=active_labels_now,
             animate=False,
-            spin_key=shared_state.get("spin_id", 0)
+            spin_key=state.get("spin_id", 0),
+            on_landed=handle_wheel_landed,
+            benchmark_id=st.session_state.wheel_benchmark_id
         )
-    
-    spin_btn = st.button("SPIN!", disabled=not can_spin, use_container_width=True, type="primary")
 
-with options_col:
+    st.button(
+        "SPIN!",
+        disabled=not can_spin or is_animating_run,
+        use_container_width=True,
+        type="primary",
+        on_click=handle_spin_click
+    )
+    if st.session_state.spin_notice:
+        notice_level, notice_text = st.session_state.spin_notice
+        if notice_level == "error":
+            st.error(notice_text)
+        else:
+            st.warning(notice_text)
+        st.session_state.spin_notice = None
+
+    if st.session_state.wheel_benchmark:
+        with st.expander("Wheel render benchmark", expanded=True):
+            st.caption("Per-frame cost of rotating the pre-rendered wheel vs repainting every segment and label.")
+            st.dataframe(
+                [
+                    {
+                        "Labels": row["labels"],
+                        "Pre-render (ms)": round(row["build_ms"], 2),
+                        "Bitmap frame (ms)": round(row["bitmap_frame_ms"], 3),
+                        "Bitmap p95 (ms)": round(row["bitmap_frame_p95_ms"], 3),
+                        "Full redraw frame (ms)": round(row["redraw_frame_ms"], 3),
+                        "Full redraw p95 (ms)": round(row["redraw_frame_p95_ms"], 3)
+                    }
+                    for row in st.session_state.wheel_benchmark
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+    # Our own spin just landed: the result section lives outside this fragment, so reveal it with one full run.
+    # Results from other devices reach it through its own polling.
+    if st.session_state.reveal_result_pending:
+        st.session_state.reveal_result_pending = False
+        st.rerun(scope="app")
+
+
+@st.fragment(run_every=SYNC_INTERVAL_SECONDS)
+@profiled("options")
+def render_current_options():
+    view = sync_shared_state(max_age_seconds=1)
     with st.expander("Current Options", expanded=False):
-        if not shared_options:
+        if not view["options"]:
             st.info("No options added yet. Use the sidebar to add some!")
-        else:
-            active_options = [opt for opt in shared_options if opt['remaining'] > 0]
-            finished_options = [opt for opt in shared_options if opt['remaining'] == 0]
-
-            if active_options:
-                st.caption("Active")
-                for opt in active_options:
-                    st.progress(opt['remaining'] / opt['limit'], text=f"{opt['name']}: {opt['remaining']} / {opt['limit']} left")
-
-            if finished_options:
-                st.caption("Depleted")
-                for opt in finished_options:
-                    st.text(f"❌ {opt['name']} (0 left)")
-
-if spin_btn:
-    with st.spinner("Spinning..."):
-        try:
-            spin_result = spin_shared_once()
-        except Exception as error:
-            st.error(f"Spin failed: {error}")
-            st.stop()
+            return
 
-        if spin_result is None:
-            st.warning("No options available to spin.")
-            st.rerun()
+        # One paged table instead of a widget per option, so the page stays the same size as options grow.
+        summary = get_options_summary(view)
+        search_col, sort_col = st.columns([1.3, 1])
+        search_text = search_col.text_input("Search", key="options_search", placeholder="Option name").strip().lower()
+        sort_order = sort_col.selectbox("Sort by", OPTIONS_SORT_ORDERS, key="options_sort")
+
+        frame = summary["frame"]
+        order = summary["orders"][sort_order]
+        if search_text:
+            matches = frame["search_key"].str.contains(search_text, regex=False).to_numpy()
+            order = order[matches[order]]
+        page_count = max(1, -(-len(order) // OPTIONS_PAGE_SIZE))
+        if st.session_state.get("options_page", 1) > page_count:
+            st.session_state.options_page = page_count
+
+        table_area = st.container()
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key="options_page")
+        start = (int(page) - 1) * OPTIONS_PAGE_SIZE
+        page_rows = frame.iloc[order[start:start + OPTIONS_PAGE_SIZE]]
+
+        with table_area:
+            st.caption(f"{summary['active']} active / {summary['total']} total")
+            if page_rows.empty:
+                st.info("No options match that search.")
+            else:
+                st.dataframe(
+                    page_rows[["Option", "Left", "Remaining", "Limit"]],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Left": st.column_config.ProgressColumn("Left", format="%.0f%%", min_value=0, max_value=100)
+                    }
+                )
+                st.caption(f"Showing {start + 1}-{start + len(page_rows)} of {len(order)}")
 
-        st.session_state.last_spin_wheel = {
-            'labels': spin_result['labels_for_spin'],
-            'winner_name': spin_result['winner_name'],
-            'spin_id': spin_result['spin_id']
-        }
-        st.session_state.pending_wheel_animation = True
-        st.session_state.last_result = {
-            'name': spin_result['winner_name'],
-            'description': spin_result['winner_description'],
-            'spin_id': spin_result['spin_id']
-        }
-        st.session_state.pending_spin_started_at_ms = current_time_ms()
-        st.session_state['result_email_input'] = ""
-        st.rerun()
 
-if st.session_state.last_result:
+@st.fragment(run_every=SYNC_INTERVAL_SECONDS)
+@profiled("result")
+def render_result_section():
+    state = sync_shared_state(max_age_seconds=1)
+    merge_latest_result(state)
+    # The winner stays hidden until this session's wheel lands (or the landing grace period runs out).
+    if st.session_state.pending_wheel_animation:
+        return
+    st.session_state.reveal_result_pending = False
     result = st.session_state.last_result
+    if not result:
+        return
+
     st.success(f"Result: **{result['name']}**")
     if result.get('description'):
         st.info(f"**Description:** {result['description']}")
-    if is_animating_run:
-        st.caption("Result is already locked in while wheel animation finishes.")
 
     st.markdown("### 📧 Send Result Automatically")
     recipient_email = st.text_input(
@@ -920,77 +2779,184 @@ if st.session_state.last_result:
             else:
                 st.caption("Email already sent for this spin result and address.")
 
-st.markdown("### 🏁 Completion & Leaderboard")
-submit_col, leaderboard_col = st.columns([1, 1.4])
 
-assignments_all = shared_state.get("assignments", [])
-pending_assignments = [item for item in assignments_all if isinstance(item, dict) and not item.get("completed_at_ms")]
-completed_assignments = [item for item in assignments_all if isinstance(item, dict) and item.get("completed_at_ms")]
+@st.fragment(run_every=SYNC_INTERVAL_SECONDS)
+@profiled("leaderboard")
+def render_completion_and_leaderboard():
+    view = sync_shared_state(max_age_seconds=1)
+    assignments_all = view.get("assignments", [])
+    pending_assignments = [item for item in assignments_all if not item.completed_at_ms]
+    completed_assignments = [item for item in assignments_all if item.completed_at_ms]
 
-with submit_col:
-    st.markdown("#### Submit Completed Task")
-    if not pending_assignments:
-        st.info("No pending assigned tasks right now.")
-    else:
-        assignment_labels = {}
-        for item in sorted(pending_assignments, key=lambda row: int(row.get("spin_id", 0))):
-            spin_id = int(item.get("spin_id", 0))
-            label = f"#{spin_id} • {item.get('option_name', 'Task')} • {format_timestamp_ms(item.get('assigned_at_ms'))}"
-            assignment_labels[label] = spin_id
-
-        with st.form("submit_completion_form", clear_on_submit=True):
-            selected_label = st.selectbox("Assigned task", list(assignment_labels.keys()))
-            team_name_input = st.text_input("Team name")
-            completion_submit = st.form_submit_button("Submit")
-
-            if completion_submit:
-                team_name = team_name_input.strip()
-                if not team_name:
-                    st.error("Please enter your team name.")
-                else:
-                    ok, message = submit_completion(assignment_labels[selected_label], team_name)
-                    if ok:
-                        st.success(message)
-                        st.rerun()
-                    else:
-                        st.error(message)
+    submit_col, leaderboard_col = st.columns([1, 1.4])
 
-with leaderboard_col:
-    st.markdown("#### Leaderboard")
-    if not completed_assignments:
-        st.info("No completed submissions yet.")
+    with submit_col:
+        st.markdown("#### Submit Completed Task")
+        if not pending_assignments:
+            st.info("No pending assigned tasks right now.")
+        else:
+            assignment_labels = {}
+            for item in sorted(pending_assignments, key=lambda row: row.spin_id):
+                spin_id = item.spin_id
+                label = f"#{spin_id} • {item.option_name} • {format_timestamp_ms(item.assigned_at_ms)}"
+                assignment_labels[label] = spin_id
+
+            with st.form("submit_completion_form", clear_on_submit=True):
+                selected_label = st.selectbox("Assigned task", list(assignment_labels.keys()))
+                team_name_input = st.text_input("Team name")
+                completion_submit = st.form_submit_button("Submit")
+
+                if completion_submit:
+                    team_name = team_name_input.strip()
+                    if not team_name:
+                        st.error("Please enter your team name.")
+                    else:
+                        ok, message = submit_completion(assignment_labels[selected_label], team_name)
+                        if ok:
+                            st.success(message)
+                            st.rerun()
+                        else:
+                            st.error(message)
+
+    with leaderboard_col:
+        st.markdown("#### Leaderboard")
+        if not completed_assignments:
+            st.info("No completed submissions yet.")
+        else:
+            leaderboard_rows = []
+            for item in completed_assignments:
+                assigned_at_ms = item.assigned_at_ms
+                completed_at_ms = item.completed_at_ms
+                duration_ms = max(completed_at_ms - assigned_at_ms, 0)
+                leaderboard_rows.append({
+                    "Team": item.team_name or "-",
+                    "Task": item.option_name or "-",
+                    "Spin #": item.spin_id,
+                    "Assigned at": format_timestamp_ms(assigned_at_ms),
+                    "Completed at": format_timestamp_ms(completed_at_ms),
+                    "Time": format_duration_ms(duration_ms),
+                    "_duration_sort": duration_ms,
+                    "_completed_sort": completed_at_ms,
+                    "_submission_seq_sort": item.submission_seq or 0
+                })
+
+            leaderboard_rows.sort(key=lambda row: (row["_duration_sort"], row["_completed_sort"], row["_submission_seq_sort"]))
+            for index, row in enumerate(leaderboard_rows, start=1):
+                row["Rank"] = index
+
+            display_rows = []
+            for row in leaderboard_rows:
+                display_rows.append({
+                    "Rank": row["Rank"],
+                    "Team": row["Team"],
+                    "Task": row["Task"],
+                    "Spin #": row["Spin #"],
+                    "Assigned at": row["Assigned at"],
+                    "Completed at": row["Completed at"],
+                    "Time": row["Time"]
+                })
+
+            st.dataframe(display_rows, use_container_width=True, hide_index=True)
+            if view.get("completed_count", 0) > len(display_rows):
+                st.caption(f"Fastest {len(display_rows)} of {view['completed_count']} completed submissions.")
+
+
+@st.fragment(run_every=SYNC_INTERVAL_SECONDS)
+@profiled("team stats")
+def render_team_stats():
+    team_stats = get_team_stats(sync_shared_state(max_age_seconds=1))
+    if team_stats is None:
+        st.info("Team stats appear once tasks are submitted.")
     else:
-        leaderboard_rows = []
-        for item in completed_assignments:
-            assigned_at_ms = int(item.get("assigned_at_ms", 0))
-            completed_at_ms = int(item.get("completed_at_ms", 0))
-            duration_ms = max(completed_at_ms - assigned_at_ms, 0)
-            leaderboard_rows.append({
-                "Team": item.get("team_name") or "-",
-                "Task": item.get("option_name") or "-",
-                "Spin #": int(item.get("spin_id", 0)),
-                "Assigned at": format_timestamp_ms(assigned_at_ms),
-                "Completed at": format_timestamp_ms(completed_at_ms),
-                "Time": format_duration_ms(duration_ms),
-                "_duration_sort": duration_ms,
-                "_completed_sort": completed_at_ms,
-                "_submission_seq_sort": int(item.get("submission_seq", 0)) if isinstance(item.get("submission_seq"), int) else 0
-            })
+        st.dataframe(
+            team_stats["summary"],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Mean time": st.column_config.NumberColumn(format="%d ms"),
+                "Median time": st.column_config.NumberColumn(format="%d ms"),
+                "P90 time": st.column_config.NumberColumn(format="%d ms"),
+                "Fastest time": st.column_config.NumberColumn(format="%d ms")
+            }
+        )
+        st.caption(f"Completed tasks over time ({team_stats['bucket_minutes']} min buckets, cumulative per team)")
+        st.line_chart(team_stats["throughput"])
+
+
+wheel_col, options_col = st.columns([2.2, 1])
+result_area = st.container()
+
+# The result section runs before the spinner, so the full run that reveals a landed spin renders it first.
+with result_area:
+    render_result_section()
 
-        leaderboard_rows.sort(key=lambda row: (row["_duration_sort"], row["_completed_sort"], row["_submission_seq_sort"]))
-        for index, row in enumerate(leaderboard_rows, start=1):
-            row["Rank"] = index
-
-        display_rows = []
-        for row in leaderboard_rows:
-            display_rows.append({
-                "Rank": row["Rank"],
-                "Team": row["Team"],
-                "Task": row["Task"],
-                "Spin #": row["Spin #"],
-                "Assigned at": row["Assigned at"],
-                "Completed at": row["Completed at"],
-                "Time": row["Time"]
+with wheel_col:
+    render_spinner()
+
+with options_col:
+    render_current_options()
+
+st.markdown("### 🏁 Completion & Leaderboard")
+render_completion_and_leaderboard()
+
+st.markdown("### 🔮 Depletion Planner")
+planner_options = [opt for opt in shared_options if opt['remaining'] > 0]
+if not planner_options:
+    st.info("Add options with remaining uses to plan upcoming spins.")
+else:
+    with st.form("depletion_planner_form"):
+        runs_col, seed_col, tail_col = st.columns(3)
+        planner_runs = runs_col.number_input("Simulated runs", min_value=1000, max_value=1_000_000, value=100_000, step=10_000)
+        planner_seed = seed_col.number_input("Seed", min_value=0, value=42, step=1)
+        planner_tail = tail_col.number_input("Final streak length", min_value=1, value=10, step=1)
+        planner_submit = st.form_submit_button("Run simulation")
+
+    planner_names = tuple(opt['name'] for opt in planner_options)
+    planner_counts = tuple(int(opt['remaining']) for opt in planner_options)
+    if planner_submit:
+        with st.spinner("Simulating spins..."):
+            st.session_state.planner_result = run_depletion_planner(
+                planner_names, planner_counts, int(planner_runs), int(planner_seed), int(planner_tail)
+            )
+        st.session_state.planner_signature = (planner_names, planner_counts)
+
+    plan = st.session_state.planner_result
+    if plan is not None:
+        if st.session_state.planner_signature != (planner_names, planner_counts):
+            st.caption("Options changed since this simulation ran. Run it again for fresh numbers.")
+
+        total_metric, tail_metric, runtime_metric = st.columns(3)
+        total_metric.metric("Spins remaining", plan["total_spins"])
+        tail_metric.metric(f"P(last {plan['tail_length']} spins on one task)", f"{plan['tail_probability']:.2%}")
+        runtime_metric.metric("Simulation time", f"{plan['elapsed_ms']:.0f} ms", f"{plan['runs']:,} runs", delta_color="off")
+        if plan["runs"] < plan.get("requested_runs", plan["runs"]):
+            st.caption(
+                f"Capped at {plan['runs']:,} of {plan['requested_runs']:,} runs to keep the plan under a second "
+                f"for {plan['total_spins']:,} remaining spins across {len(plan['names'])} options."
+            )
+
+        plan_rows = []
+        for index in np.argsort(plan["mean_rank"], kind="stable"):
+            plan_rows.append({
+                "Expected order": len(plan_rows) + 1,
+                "Option": plan["names"][index],
+                "Mean depletion spin": round(float(plan["mean_spin"][index]), 1),
+                "P10": int(plan["p10_spin"][index]),
+                "Median": int(plan["median_spin"][index]),
+                "P90": int(plan["p90_spin"][index]),
+                "P(runs out first)": f"{plan['first_probability'][index]:.1%}"
             })
+        st.dataframe(plan_rows, use_container_width=True, hide_index=True)
+
+        chart_option = st.selectbox("Depletion spin distribution for", plan["names"], key="planner_chart_option")
+        chart_index = plan["names"].index(chart_option)
+        st.bar_chart(
+            {"Spin": plan["bin_spins"], "Share of runs": plan["histogram"][chart_index] / plan["runs"]},
+            x="Spin",
+            y="Share of runs"
+        )
+
+st.markdown("### 👥 Team stats")
+render_team_stats()
 
-        st.dataframe(display_rows, use_container_width=True, hide_index=True)
+finish_profile(script_profile)